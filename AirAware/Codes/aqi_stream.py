@@ -0,0 +1,299 @@
+import argparse
+import logging
+import sys
+import time
+from collections import deque
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / 'common'))
+from dataset_loader import array_categories, load_arrays  # noqa: E402
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+POLLUTANTS = ['AQI', 'PM2.5', 'PM10', 'CO', 'NO2', 'SO2', 'O3']
+# Histogram range per pollutant; readings above the top edge land in the last bin
+UPPER_BOUNDS = {'AQI': 500, 'PM2.5': 500, 'PM10': 600, 'CO': 50, 'NO2': 400, 'SO2': 400, 'O3': 400}
+DEFAULT_WINDOWS = ('1h', '8h', '24h')
+
+
+class AlertRule:
+    # Fires when `stat` ('value', 'mean' or 'max') of `pollutant` over `window` goes above `threshold`, and
+    # clears when it drops back to or below it. Defaults follow the CPCB "Poor" band limits.
+    def __init__(self, name: str, pollutant: str, threshold: float, stat: str = 'mean', window: str = '24h'):
+        if stat not in ('value', 'mean', 'max'):
+            raise ValueError(f"Unknown alert statistic '{stat}', expected 'value', 'mean' or 'max'")
+        self.name = name
+        self.pollutant = pollutant
+        self.threshold = threshold
+        self.stat = stat
+        self.window = window
+
+
+DEFAULT_RULES = [
+    AlertRule('aqi_very_poor', 'AQI', 300, stat='value'),
+    AlertRule('pm25_24h', 'PM2.5', 60),
+    AlertRule('pm10_24h', 'PM10', 100),
+    AlertRule('no2_24h', 'NO2', 80),
+    AlertRule('so2_24h', 'SO2', 80),
+    AlertRule('o3_8h', 'O3', 100, window='8h'),
+    AlertRule('co_8h', 'CO', 2, window='8h'),
+]
+
+
+class RingWindow:
+    # Time-based sliding window over one city's readings. Rows live in NumPy ring arrays indexed by sequence
+    # number; running sums give the mean, per-pollutant monotonic deques give the max and fixed-bin histograms
+    # give percentiles, so a reading costs O(1) amortised (one insert plus the evictions it triggers).
+    # A reading may miss pollutants (non-finite values, e.g. a sensor gap): push() takes a `present` mask, the
+    # missing values arrive as 0 so they never touch the sums, and `counts` holds each column's readings.
+    def __init__(self, span_ns: int, n_values: int, bins: int, capacity: int = 64):
+        self.span_ns = span_ns
+        self.capacity = capacity
+        self.times = np.empty(capacity, dtype=np.int64)
+        self.values = np.empty((capacity, n_values), dtype=np.float64)
+        self.bin_ids = np.empty((capacity, n_values), dtype=np.intp)
+        self.present = np.empty((capacity, n_values), dtype=bool)
+        self.partial = np.empty(capacity, dtype=bool)  # row has a missing pollutant; `present` is only read then
+        self.first = 0  # sequence number of the oldest reading in the window
+        self.next = 0
+        self.sums = np.zeros(n_values)
+        self.counts = np.zeros(n_values, dtype=np.int64)
+        self.hist = np.zeros((n_values, bins), dtype=np.int64)
+        self.maxima = [deque() for _ in range(n_values)]  # (sequence, value), values decreasing
+        self._columns = np.arange(n_values)
+
+    def __len__(self) -> int:
+        return self.next - self.first
+
+    def _grow(self):
+        # Doubling keeps positions at sequence % capacity, so live rows are re-slotted once per doubling
+        sequence = np.arange(self.first, self.next)
+        old, new = sequence % self.capacity, sequence % (2 * self.capacity)
+        self.capacity *= 2
+        for name in ('times', 'values', 'bin_ids', 'present', 'partial'):
+            array = getattr(self, name)
+            grown = np.empty((self.capacity,) + array.shape[1:], dtype=array.dtype)
+            grown[new] = array[old]
+            setattr(self, name, grown)
+
+    def push(self, timestamp: int, values: np.ndarray, bin_ids: np.ndarray, present: Optional[np.ndarray] = None):
+        # present=None means every pollutant has a reading
+        cutoff = timestamp - self.span_ns
+        while self.first < self.next and self.times[self.first % self.capacity] <= cutoff:
+            position = self.first % self.capacity
+            self.sums -= self.values[position]
+            if self.partial[position]:
+                kept = self.present[position]
+                self.counts -= kept
+                self.hist[self._columns[kept], self.bin_ids[position][kept]] -= 1
+            else:
+                self.counts -= 1
+                self.hist[self._columns, self.bin_ids[position]] -= 1
+            for maxima in self.maxima:
+                if maxima and maxima[0][0] == self.first:
+                    maxima.popleft()
+            self.first += 1
+        if len(self) == self.capacity:
+            self._grow()
+        position = self.next % self.capacity
+        self.times[position] = timestamp
+        self.values[position] = values
+        self.bin_ids[position] = bin_ids
+        self.sums += values
+        self.partial[position] = present is not None
+        if present is None:
+            self.counts += 1
+            self.hist[self._columns, bin_ids] += 1
+            valid = [True] * len(self.maxima)
+        else:
+            self.present[position] = present
+            self.counts += present
+            self.hist[self._columns[present], bin_ids[present]] += 1
+            valid = present.tolist()
+        for maxima, value, keep in zip(self.maxima, values.tolist(), valid):
+            if not keep:
+                continue
+            while maxima and maxima[-1][1] <= value:
+                maxima.pop()
+            maxima.append((self.next, value))
+        self.next += 1
+
+    def mean(self, column: int) -> float:
+        return self.sums[column] / self.counts[column] if self.counts[column] else float('nan')
+
+    def max(self, column: int) -> float:
+        return self.maxima[column][0][1] if self.maxima[column] else float('nan')
+
+    def percentiles(self, column: int, quantiles: Sequence[float], bin_width: float) -> List[float]:
+        # Linear interpolation inside the bin holding each rank; error is at most one bin width
+        if not self.counts[column]:
+            return [float('nan')] * len(quantiles)
+        cumulative = np.cumsum(self.hist[column])
+        ranks = np.asarray(quantiles) / 100 * self.counts[column]
+        bins = np.minimum(np.searchsorted(cumulative, ranks, side='left'), len(cumulative) - 1)
+        below = np.where(bins > 0, cumulative[bins - 1], 0)
+        inside = (ranks - below) / np.maximum(self.hist[column][bins], 1)
+        return ((bins + np.clip(inside, 0, 1)) * bin_width).tolist()
+
+
+class RollingAQIAggregator:
+    # One RingWindow per city and window length. update() is the per-reading hot path; snapshot() renders the
+    # dashboard table on demand instead of recomputing from the full history.
+    def __init__(self, windows: Sequence[str] = DEFAULT_WINDOWS, pollutants: Sequence[str] = POLLUTANTS,
+                 rules: Sequence[AlertRule] = DEFAULT_RULES, bins: int = 512):
+        self.windows = list(windows)
+        self.spans = [pd.Timedelta(window).value for window in self.windows]
+        self.pollutants = list(pollutants)
+        self.bins = bins
+        upper = np.array([UPPER_BOUNDS.get(pollutant, 1000) for pollutant in self.pollutants], dtype=np.float64)
+        self.bin_widths = upper / bins
+        self.rules = [rule for rule in rules if rule.pollutant in self.pollutants]
+        for rule in self.rules:
+            if rule.stat != 'value' and rule.window not in self.windows:
+                raise ValueError(f"Alert rule '{rule.name}' uses window '{rule.window}', not one of {self.windows}")
+        self._rule_plan = [(rule, self.pollutants.index(rule.pollutant),
+                            self.windows.index(rule.window) if rule.stat != 'value' else None)
+                           for rule in self.rules]
+        self.cities: Dict[str, List[RingWindow]] = {}
+        self.breached: Dict[str, List[bool]] = {}
+        self.readings = 0
+        self.alerts: List[Dict] = []
+
+    def _city(self, city: str) -> List[RingWindow]:
+        windows = self.cities.get(city)
+        if windows is None:
+            windows = self.cities[city] = [RingWindow(span, len(self.pollutants), self.bins) for span in self.spans]
+            self.breached[city] = [False] * len(self.rules)
+        return windows
+
+    def update(self, city: str, timestamp: int, values: np.ndarray) -> List[Dict]:
+        # timestamp is epoch nanoseconds; readings are expected in time order per city (the replay sorts them)
+        windows = self._city(city)
+        values = np.asarray(values, dtype=np.float64)
+        present = np.isfinite(values)
+        if present.all():
+            present = None
+        else:
+            # Zeroed so neither the sums nor the bin ids see them; the windows leave these columns out
+            values = np.where(present, values, 0.0)
+        bin_ids = np.minimum((values / self.bin_widths).astype(np.intp), self.bins - 1)
+        np.maximum(bin_ids, 0, out=bin_ids)
+        for window in windows:
+            window.push(timestamp, values, bin_ids, present)
+        self.readings += 1
+
+        fired = []
+        breached = self.breached[city]
+        for i, (rule, column, window_id) in enumerate(self._rule_plan):
+            if rule.stat == 'value':
+                if present is not None and not present[column]:
+                    continue
+                level = values[column]
+            elif rule.stat == 'mean':
+                level = windows[window_id].mean(column)
+            else:
+                level = windows[window_id].max(column)
+            if level != level:
+                continue  # no reading of this pollutant in the window: keep the current alert state
+            above = level > rule.threshold
+            if above != breached[i]:
+                breached[i] = above
+                fired.append({'city': city, 'timestamp': pd.Timestamp(timestamp), 'rule': rule.name,
+                              'state': 'breach' if above else 'clear', 'level': round(float(level), 2),
+                              'threshold': rule.threshold})
+        self.alerts.extend(fired)
+        return fired
+
+    def active_alerts(self) -> Dict[str, List[str]]:
+        return {city: [rule.name for rule, on in zip(self.rules, states) if on]
+                for city, states in self.breached.items() if any(states)}
+
+    def snapshot(self, cities: Optional[Sequence[str]] = None, windows: Optional[Sequence[str]] = None,
+                 percentiles: Sequence[float] = (50, 95)) -> pd.DataFrame:
+        rows = []
+        for city in cities or sorted(self.cities):
+            for window_name, ring in zip(self.windows, self.cities[city]):
+                if windows and window_name not in windows:
+                    continue
+                for column, pollutant in enumerate(self.pollutants):
+                    row = {'city': city, 'window': window_name, 'pollutant': pollutant,
+                           'count': int(ring.counts[column]), 'mean': ring.mean(column), 'max': ring.max(column)}
+                    quantiles = ring.percentiles(column, percentiles, self.bin_widths[column])
+                    row.update({f'p{q:g}': value for q, value in zip(percentiles, quantiles)})
+                    rows.append(row)
+        return pd.DataFrame(rows)
+
+
+def load_readings(csv_path: Optional[str] = None, pollutants: Sequence[str] = POLLUTANTS
+                  ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, List[str]]:
+    # (timestamps ns, city codes, values [n, pollutants], city names) in stream order
+    arrays = load_arrays('airaware', csv_path, columns=['Timestamp', 'City'] + list(pollutants))
+    cities = array_categories('airaware', 'City', csv_path)
+    order = np.argsort(arrays['Timestamp'], kind='stable')
+    values = np.column_stack([np.asarray(arrays[pollutant], dtype=np.float64) for pollutant in pollutants])
+    return np.asarray(arrays['Timestamp'])[order], np.asarray(arrays['City'])[order], values[order], cities
+
+
+def replay(aggregator: RollingAQIAggregator, csv_path: Optional[str] = None, speed: Optional[float] = None,
+           repeat: int = 1) -> Dict[str, float]:
+    # speed=None replays as fast as possible; speed=N plays N seconds of readings per wall-clock second.
+    # repeat>1 appends shifted copies of the file after each other to stretch the stream for benchmarking.
+    timestamps, codes, values, cities = load_readings(csv_path, aggregator.pollutants)
+    period = int(timestamps[-1] - timestamps[0]) + 1 if len(timestamps) else 0
+    rows = values.tolist()
+    start = time.perf_counter()
+    stream_start = int(timestamps[0]) if len(timestamps) else 0
+    alerts = 0
+    for copy in range(repeat):
+        shift = copy * period
+        for timestamp, code, row in zip((timestamps + shift).tolist(), codes.tolist(), rows):
+            if speed:
+                delay = (timestamp - stream_start) / 1e9 / speed - (time.perf_counter() - start)
+                if delay > 0:
+                    time.sleep(delay)
+            alerts += len(aggregator.update(cities[code], timestamp, np.array(row)))
+    elapsed = time.perf_counter() - start
+    readings = len(rows) * repeat
+    return {'readings': readings, 'seconds': elapsed, 'readings_per_sec': readings / elapsed if elapsed else 0.0,
+            'alerts': alerts}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay AirAware readings through the rolling AQI aggregator")
+    parser.add_argument('--input', help="AQI CSV; defaults to the bundled dataset")
+    parser.add_argument('--windows', nargs='+', default=list(DEFAULT_WINDOWS))
+    parser.add_argument('--speed', type=float, help="stream seconds per wall-clock second (default: unthrottled)")
+    parser.add_argument('--repeat', type=int, default=1, help="replay the file this many times back to back")
+    parser.add_argument('--percentiles', type=float, nargs='+', default=[50, 95])
+    parser.add_argument('--output', help="write the final snapshot to this CSV")
+    parser.add_argument('--alerts-output', help="write the alert log to this CSV")
+    args = parser.parse_args()
+
+    rules = [rule for rule in DEFAULT_RULES if rule.stat == 'value' or rule.window in args.windows]
+    aggregator = RollingAQIAggregator(args.windows, rules=rules)
+    stats = replay(aggregator, args.input, args.speed, args.repeat)
+    logger.info(f"Replayed {stats['readings']} readings in {stats['seconds']:.2f}s "
+                f"({stats['readings_per_sec']:.0f} readings/sec), {stats['alerts']} alert transitions")
+
+    snapshot = aggregator.snapshot(percentiles=args.percentiles)
+    aqi = snapshot[snapshot['pollutant'] == 'AQI'].drop(columns='pollutant')
+    print(aqi.round(1).to_string(index=False))
+    active = aggregator.active_alerts()
+    print(f"\nActive alerts: {sum(len(rules) for rules in active.values())} across {len(active)} cities")
+    for city, names in sorted(active.items()):
+        print(f"  {city}: {', '.join(names)}")
+    if args.output:
+        snapshot.to_csv(args.output, index=False)
+        logger.info(f"Snapshot written to {args.output}")
+    if args.alerts_output:
+        pd.DataFrame(aggregator.alerts).to_csv(args.alerts_output, index=False)
+        logger.info(f"Alert log written to {args.alerts_output}")
+
+
+if __name__ == "__main__":
+    main()
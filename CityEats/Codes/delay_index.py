@@ -0,0 +1,438 @@
+import argparse
+import itertools
+import logging
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / 'common'))
+from dataset_loader import get_schema, load_dataset, read_appended, resolve_path  # noqa: E402
+from rollup_cube import Dimension  # noqa: E402
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+KEYS = ['area', 'restaurant', 'bucket', 'weather']
+QUANTILES = (50, 90, 95)
+
+
+@dataclass
+class DelayStats:
+    # Power sums rather than running mean/M2, so merging two stats (or two index cells) is plain addition.
+    # Integer delay minutes keep the sums exact in float64.
+    count: int
+    total: float
+    total_sq: float
+    minimum: float
+    maximum: float
+    hist: np.ndarray
+    low: float
+    bin_width: float
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else float('nan')
+
+    @property
+    def variance(self) -> float:
+        if self.count < 2:
+            return float('nan')
+        return max(self.total_sq - self.total * self.total / self.count, 0.0) / (self.count - 1)
+
+    def quantile(self, q: float) -> float:
+        # Nearest rank over the histogram, clamped to the exact min/max; exact for whole minutes at width 1
+        if not self.count:
+            return float('nan')
+        rank = max(int(np.ceil(q / 100 * self.count)), 1)
+        position = int(np.searchsorted(np.cumsum(self.hist), rank))
+        value = self.low + (position - 1) * self.bin_width
+        return float(min(max(value, self.minimum), self.maximum))
+
+    def merge(self, other: 'DelayStats') -> 'DelayStats':
+        return DelayStats(self.count + other.count, self.total + other.total, self.total_sq + other.total_sq,
+                          min(self.minimum, other.minimum), max(self.maximum, other.maximum),
+                          self.hist + other.hist, self.low, self.bin_width)
+
+    def to_dict(self, quantiles: Sequence[float] = QUANTILES) -> Dict[str, float]:
+        row = {'orders': self.count, 'mean': self.mean, 'std': self.variance ** 0.5, 'min': self.minimum,
+               'max': self.maximum}
+        row.update({f'p{q:g}': self.quantile(q) for q in quantiles})
+        return row
+
+
+class SparseHistograms:
+    # Histograms for many mostly-empty cells: sorted `cell * bins + bin` keys with their counts. Only occupied
+    # bins are stored, so memory follows the orders seen rather than cells x bins. Adding is a merge of sorted
+    # keys, so two sets of histograms (or a batch) combine exactly.
+    def __init__(self, bins: int):
+        self.bins = bins
+        self.keys = np.empty(0, dtype=np.int64)
+        self.counts = np.empty(0, dtype=np.int64)
+
+    def add(self, keys: np.ndarray, counts: Optional[np.ndarray] = None):
+        keys, inverse = np.unique(keys, return_inverse=True)
+        counts = np.bincount(inverse, weights=counts, minlength=len(keys)).astype(np.int64)
+        at = np.searchsorted(self.keys, keys)
+        found = at < len(self.keys)
+        found[found] = self.keys[at[found]] == keys[found]
+        self.counts[at[found]] += counts[found]
+        self.keys = np.insert(self.keys, at[~found], keys[~found])
+        self.counts = np.insert(self.counts, at[~found], counts[~found])
+
+    def rows(self, cells: np.ndarray) -> np.ndarray:
+        # One dense histogram row per flat cell id
+        cells = np.asarray(cells, dtype=np.int64).reshape(-1)
+        start = np.searchsorted(self.keys, cells * self.bins)
+        lengths = np.searchsorted(self.keys, (cells + 1) * self.bins) - start
+        entries = np.repeat(start - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+        out = np.zeros((len(cells), self.bins), dtype=np.int64)
+        out[np.repeat(np.arange(len(cells)), lengths), self.keys[entries] % self.bins] = self.counts[entries]
+        return out
+
+    def remap(self, cell_map):
+        # Re-keys the stored cells through `cell_map` (flat ids -> flat ids), e.g. after the dense shape grew
+        cells, bins = np.divmod(self.keys, self.bins)
+        keys, counts = cell_map(cells) * self.bins + bins, self.counts
+        order = np.argsort(keys, kind='stable')
+        self.keys, self.counts = keys[order], counts[order]
+
+    @property
+    def nbytes(self) -> int:
+        return self.keys.nbytes + self.counts.nbytes
+
+
+class DelayIndex:
+    # Dense delay statistics keyed by area x restaurant x time bucket x weather. Every axis has an "all" slot at
+    # position 0, and each order is added to all 16 combinations of specific/all keys, so any drill-down is a
+    # direct cell read (O(bins)) instead of a scan. Vocabularies only grow; appends never rewrite old cells.
+    # Histogram bins are `bin_width` minutes from `low` to `high`, plus one underflow and one overflow bin.
+    # Cells with at most `hist_keys` specific keys keep dense histograms; the finer cells hold a handful of orders
+    # each, so their histograms are sparse (SparseHistograms) rather than multiplying memory by the bin count.
+    def __init__(self, time_bucket: str = 'hour', low: float = -30, high: float = 120, bin_width: float = 1,
+                 hist_keys: int = 2):
+        if time_bucket == 'hour':
+            bucket = Dimension('bucket', 'Order_Time', 'hour')
+        elif time_bucket == 'time_of_day':
+            bucket = Dimension('bucket', 'Time_of_Day')
+        else:
+            raise ValueError(f"Unknown time bucket '{time_bucket}', expected 'hour' or 'time_of_day'")
+        self.time_bucket = time_bucket
+        self.dimensions = [Dimension('area', 'Area'), Dimension('restaurant', 'Restaurant'), bucket,
+                           Dimension('weather', 'Weather')]
+        self.low = low
+        self.bin_width = bin_width
+        self.bins = int(np.ceil((high - low) / bin_width)) + 2
+        self.hist_keys = hist_keys
+        self.shape = tuple(max(8, len(dim.labels) + 1) for dim in self.dimensions)
+        self._allocate(self.shape)
+        self.sparse = SparseHistograms(self.bins)
+        self.rows = 0
+        self.skipped = 0  # orders left out because a key was missing
+        self.offset = 0  # bytes of the source CSV already indexed; only from_source/refresh move it
+        self._lookups: List[Dict] = [{} for _ in self.dimensions]
+
+    def _allocate(self, shape):
+        self.count = np.zeros(shape, dtype=np.int64)
+        self.total = np.zeros(shape)
+        self.total_sq = np.zeros(shape)
+        self.minimum = np.full(shape, np.inf)
+        self.maximum = np.full(shape, -np.inf)
+        # Keyed by which axes are specific; each array covers only those axes, plus the bins
+        self.hists: Dict[Tuple[bool, ...], np.ndarray] = {
+            mask: np.zeros(tuple(size for size, keep in zip(shape, mask) if keep) + (self.bins,), dtype=np.int32)
+            for mask in itertools.product((True, False), repeat=len(shape)) if sum(mask) <= self.hist_keys
+        }
+
+    def _arrays(self):
+        return ['count', 'total', 'total_sq', 'minimum', 'maximum']
+
+    def _hist(self, position: Tuple) -> np.ndarray:
+        # Histogram(s) at a cell position; an axis may hold an array of positions, giving one row each
+        mask = tuple(not isinstance(index, (int, np.integer)) or index != 0 for index in position)
+        hist = self.hists.get(mask)
+        if hist is not None:
+            return hist[tuple(index for index, keep in zip(position, mask) if keep)]
+        rows = self.sparse.rows(np.ravel_multi_index(np.broadcast_arrays(*position), self.shape))
+        return rows if any(np.ndim(index) for index in position) else rows[0]
+
+    def _fit(self):
+        needed = tuple(len(dim.labels) + 1 for dim in self.dimensions)
+        if all(n <= size for n, size in zip(needed, self.shape)):
+            return
+        old = {name: getattr(self, name) for name in self._arrays()}
+        old_hists = self.hists
+        old_shape = self.shape
+        used = tuple(slice(0, size) for size in self.shape)
+        self.shape = tuple(size if n <= size else max(size + size // 2, n) for n, size in zip(needed, self.shape))
+        self.sparse.remap(lambda cells: np.ravel_multi_index(np.unravel_index(cells, old_shape), self.shape))
+        self._allocate(self.shape)
+        for name, array in old.items():
+            getattr(self, name)[used] = array
+        for mask, hist in old_hists.items():
+            self.hists[mask][tuple(part for part, keep in zip(used, mask) if keep)] = hist
+
+    def _bin(self, delays: np.ndarray) -> np.ndarray:
+        return np.clip(np.floor((delays - self.low) / self.bin_width).astype(np.int64) + 1, 0, self.bins - 1)
+
+    def append(self, frame: pd.DataFrame, delay_column: str = 'Delay_Minutes') -> int:
+        if frame.empty:
+            return 0
+        codes = [dim.encode(frame) + 1 for dim in self.dimensions]
+        # A missing key would land in the "all" slot (code -1 + 1), so those orders are dropped and counted
+        complete = np.logical_and.reduce([code > 0 for code in codes])
+        if not complete.all():
+            self.skipped += int((~complete).sum())
+            logger.warning(f"Skipped {int((~complete).sum())} orders with a missing key ({self.skipped} so far)")
+            frame = frame[complete]
+            codes = [code[complete] for code in codes]
+        self._fit()
+        delays = frame[delay_column].to_numpy(dtype=np.float64)
+        bins = self._bin(delays)
+        squares = delays * delays
+        # Scatter into the 16 specific/"all" combinations; repeated cells within a batch accumulate
+        zeros = np.zeros(len(frame), dtype=np.int64)
+        for mask in itertools.product((True, False), repeat=len(self.dimensions)):
+            flat = np.ravel_multi_index([code if keep else zeros for code, keep in zip(codes, mask)], self.shape)
+            np.add.at(self.count.reshape(-1), flat, 1)
+            np.add.at(self.total.reshape(-1), flat, delays)
+            np.add.at(self.total_sq.reshape(-1), flat, squares)
+            np.minimum.at(self.minimum.reshape(-1), flat, delays)
+            np.maximum.at(self.maximum.reshape(-1), flat, delays)
+            hist = self.hists.get(mask)
+            if hist is None:
+                self.sparse.add(flat * self.bins + bins)
+                continue
+            kept = [code for code, keep in zip(codes, mask) if keep]
+            cell = np.ravel_multi_index(kept, hist.shape[:-1]) if kept else zeros
+            np.add.at(hist.reshape(-1), cell * self.bins + bins, 1)
+        self.rows += len(frame)
+        return len(frame)
+
+    @classmethod
+    def from_source(cls, path: Optional[str] = None, **kwargs) -> 'DelayIndex':
+        # Indexes the source CSV and records how far it read, so refresh() picks up from there
+        index = cls(**kwargs)
+        index.refresh(path)
+        return index
+
+    def refresh(self, path: Optional[str] = None) -> int:
+        # Indexes only the orders appended to the source CSV since the last refresh
+        if (self.rows or self.skipped) and not self.offset:
+            raise ValueError("Index rows came from append(), so the source offset is unknown and refresh() would "
+                             "count them again; build the index with DelayIndex.from_source instead")
+        frame, self.offset = read_appended('cityeats', path, self.offset)
+        return self.append(frame)
+
+    def _position(self, axis: int, label) -> Optional[int]:
+        # Label -> cell position through a dict rebuilt only when the vocabulary grows, keeping queries off
+        # the pandas index machinery
+        if label is None:
+            return 0
+        dim, lookup = self.dimensions[axis], self._lookups[axis]
+        if len(lookup) != len(dim.labels):
+            lookup.clear()
+            lookup.update((value, code + 1) for code, value in enumerate(dim.display()))
+        return lookup.get(label)
+
+    def stats(self, area=None, restaurant=None, bucket=None, weather=None) -> DelayStats:
+        # None means all values of that key
+        labels = (area, restaurant, bucket, weather)
+        position = tuple(self._position(axis, label) for axis, label in enumerate(labels))
+        if None in position:
+            return DelayStats(0, 0.0, 0.0, float('nan'), float('nan'), np.zeros(self.bins, dtype=np.int32),
+                              self.low, self.bin_width)
+        return DelayStats(int(self.count[position]), float(self.total[position]), float(self.total_sq[position]),
+                          float(self.minimum[position]), float(self.maximum[position]), self._hist(position),
+                          self.low, self.bin_width)
+
+    def drill_down(self, by: str, quantiles: Sequence[float] = QUANTILES, **filters) -> pd.DataFrame:
+        # One row per value of `by` with the other keys fixed by `filters` (or all); vectorised over the slice
+        axis = KEYS.index(by)
+        dim = self.dimensions[axis]
+        position = []
+        for key_axis, key in enumerate(KEYS):
+            if key == by:
+                position.append(dim.order() + 1)
+            else:
+                index = self._position(key_axis, filters.get(key))
+                if index is None:
+                    return pd.DataFrame(columns=['orders', 'mean', 'std', 'min', 'max'])
+                position.append(index)
+        position = tuple(position)
+        count = self.count[position]
+        keep = count > 0
+        count = count[keep]
+        total = self.total[position][keep]
+        total_sq = self.total_sq[position][keep]
+        minimum = self.minimum[position][keep]
+        maximum = self.maximum[position][keep]
+        variance = np.where(count > 1, np.maximum(total_sq - total * total / count, 0) / np.maximum(count - 1, 1),
+                            np.nan)
+        columns = {'orders': count, 'mean': total / count, 'std': np.sqrt(variance), 'min': minimum, 'max': maximum}
+        cumulative = np.cumsum(self._hist(position)[keep], axis=1)
+        for q in quantiles:
+            ranks = np.maximum(np.ceil(q / 100 * count), 1)
+            bins = (cumulative < ranks[:, None]).sum(axis=1)
+            columns[f'p{q:g}'] = np.clip(self.low + (bins - 1) * self.bin_width, minimum, maximum)
+        return pd.DataFrame(columns, index=dim.display()[dim.order()[keep]])
+
+    def merge(self, other: 'DelayIndex') -> 'DelayIndex':
+        # Folds another index (e.g. one built by a separate worker over part of the stream) into this one
+        if (other.time_bucket, other.low, other.bin_width, other.bins, other.hist_keys) != (
+                self.time_bucket, self.low, self.bin_width, self.bins, self.hist_keys):
+            raise ValueError("Indexes with different time buckets or histogram bins cannot be merged")
+        mapping = []
+        for dim, theirs in zip(self.dimensions, other.dimensions):
+            codes = dim._encode(theirs.labels.to_numpy()) + 1 if len(theirs.labels) else np.empty(0, dtype=np.intp)
+            mapping.append(np.concatenate([[0], codes]))
+        self._fit()
+        target = np.ix_(*mapping)
+        source = tuple(slice(0, len(codes)) for codes in mapping)
+        self.count[target] += other.count[source]
+        self.total[target] += other.total[source]
+        self.total_sq[target] += other.total_sq[source]
+        self.minimum[target] = np.minimum(self.minimum[target], other.minimum[source])
+        self.maximum[target] = np.maximum(self.maximum[target], other.maximum[source])
+        for mask, hist in self.hists.items():
+            kept = [codes for codes, keep in zip(mapping, mask) if keep]
+            hist[np.ix_(*kept) if kept else ()] += other.hists[mask][tuple(slice(0, len(codes)) for codes in kept)]
+        positions = np.unravel_index(other.sparse.keys // other.bins, other.shape)
+        cells = np.ravel_multi_index([codes[axis] for codes, axis in zip(mapping, positions)], self.shape)
+        self.sparse.add(cells * self.bins + other.sparse.keys % other.bins, other.sparse.counts)
+        self.rows += other.rows
+        self.skipped += other.skipped
+        return self
+
+    def nbytes(self) -> int:
+        return (sum(getattr(self, name).nbytes for name in self._arrays())
+                + sum(hist.nbytes for hist in self.hists.values()) + self.sparse.nbytes)
+
+
+def synthetic_orders(frame: pd.DataFrame, rows: int, seed: int = 0) -> pd.DataFrame:
+    # Resampled orders with fresh, increasing order times, for streams larger than the bundled file
+    rng = np.random.default_rng(seed)
+    orders = frame.iloc[rng.integers(0, len(frame), rows)].reset_index(drop=True)
+    start = frame['Order_Time'].min()
+    orders['Order_Time'] = start + pd.to_timedelta(np.sort(rng.integers(0, 365 * 86400, rows)), unit='s')
+    return orders
+
+
+def spot_check(index: DelayIndex, orders: pd.DataFrame):
+    # Compares cells with one to four fixed keys, and a drill-down over a three-key slice, with pandas scans
+    columns = {'area': orders['Area'], 'restaurant': orders['Restaurant'], 'weather': orders['Weather'],
+               'bucket': pd.Series(np.asarray(index.dimensions[KEYS.index('bucket')].values(orders)), orders.index)}
+    sample = {key: column.iloc[len(orders) // 2] for key, column in columns.items()}
+    if index.rows != len(orders):
+        raise SystemExit(f"Index holds {index.rows} orders, expected {len(orders)}")
+    for fixed in ([], ['area'], ['area', 'weather'], ['restaurant'], ['area', 'restaurant', 'weather'], KEYS):
+        filters = {key: sample[key] for key in fixed}
+        mask = np.ones(len(orders), dtype=bool)
+        for key, value in filters.items():
+            mask &= (columns[key] == value).to_numpy()
+        delays = orders.loc[mask, 'Delay_Minutes'].to_numpy(dtype=np.float64)
+        stats = index.stats(**filters)
+        expected = [len(delays), delays.mean(), delays.std(ddof=1) if len(delays) > 1 else np.nan,
+                    np.percentile(delays, 90, method='inverted_cdf')]
+        if not np.allclose([stats.count, stats.mean, stats.variance ** 0.5, stats.quantile(90)], expected,
+                           equal_nan=True):
+            raise SystemExit(f"Index disagrees with a pandas scan for {filters}")
+    filters = {'area': sample['area'], 'weather': sample['weather']}
+    mask = ((columns['area'] == sample['area']) & (columns['weather'] == sample['weather'])).to_numpy()
+    expected = orders[mask].groupby('Restaurant', observed=True)['Delay_Minutes'].agg(
+        lambda delays: np.percentile(delays, 90, method='inverted_cdf'))
+    drilled = index.drill_down('restaurant', quantiles=(90,), **filters)['p90']
+    if not np.allclose(drilled.reindex(expected.index.astype(str)).to_numpy(), expected.to_numpy()):
+        raise SystemExit(f"Index drill-down by restaurant disagrees with a pandas group-by for {filters}")
+
+
+def check_refresh(path: Optional[str] = None, time_bucket: str = 'hour', batches: int = 4) -> int:
+    # Indexes the first half of a copy of the CSV, appends the other half in `batches` writes with a refresh
+    # after each, and spot-checks the result against pandas over the whole file. Returns the orders refreshed.
+    source = resolve_path(get_schema('cityeats'), path)
+    with open(source, 'rb') as f:
+        header, *lines = f.read().splitlines(keepends=True)
+    if lines and not lines[-1].endswith(b'\n'):
+        lines[-1] += b'\n'
+    half = len(lines) // 2
+    with tempfile.TemporaryDirectory() as tmp:
+        copy = Path(tmp) / source.name
+        with open(copy, 'wb') as f:
+            f.write(header + b''.join(lines[:half]))
+        index = DelayIndex.from_source(str(copy), time_bucket=time_bucket)
+        refreshed = 0
+        step = max(-(-(len(lines) - half) // batches), 1)
+        for begin in range(half, len(lines), step):
+            with open(copy, 'ab') as f:
+                f.write(b''.join(lines[begin:begin + step]))
+            refreshed += index.refresh(str(copy))
+        if index.refresh(str(copy)):
+            raise SystemExit("A refresh with nothing appended added orders")
+        orders = load_dataset('cityeats', str(copy), use_cache=False)
+    spot_check(index, orders)
+    return refreshed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the CityEats delay index and time drill-down queries")
+    parser.add_argument('--input', help="delivery CSV; defaults to the bundled dataset")
+    parser.add_argument('--time-bucket', choices=['hour', 'time_of_day'], default='hour')
+    parser.add_argument('--scale', type=int, help="stream this many resampled orders instead of the file")
+    parser.add_argument('--batch', type=int, default=1000, help="orders per append")
+    parser.add_argument('--queries', type=int, default=2000, help="random drill-downs to time")
+    args = parser.parse_args()
+
+    orders = load_dataset('cityeats', args.input)
+    if args.scale:
+        orders = synthetic_orders(orders, args.scale)
+    index = DelayIndex(args.time_bucket)
+    start = time.perf_counter()
+    for begin in range(0, len(orders), args.batch):
+        index.append(orders.iloc[begin:begin + args.batch])
+    elapsed = time.perf_counter() - start
+    logger.info(f"Indexed {index.rows} orders in {elapsed:.2f}s ({index.rows / elapsed:.0f} orders/sec), "
+                f"{index.nbytes() / 1e6:.1f} MB")
+
+    spot_check(index, orders)
+    if not args.scale:
+        refreshed = check_refresh(args.input, args.time_bucket)
+        print(f"Refresh check: {refreshed} orders appended to a copy of the CSV and refreshed in; index matches pandas")
+
+    # Random drill-downs: one key grouped, a random subset of the others fixed
+    rng = np.random.default_rng(0)
+    labels = {key: dim.display().tolist() for key, dim in zip(KEYS, index.dimensions)}
+    point, grouped = [], []
+    for _ in range(args.queries):
+        filters = {key: values[rng.integers(len(values))] for key, values in labels.items() if rng.random() < 0.5}
+        start = time.perf_counter()
+        index.stats(**filters).to_dict()
+        point.append(time.perf_counter() - start)
+        by = KEYS[rng.integers(len(KEYS))]
+        filters.pop(by, None)
+        start = time.perf_counter()
+        index.drill_down(by, **filters)
+        grouped.append(time.perf_counter() - start)
+    for name, latencies in (('point stats', point), ('drill-down', grouped)):
+        latencies = np.array(latencies) * 1e6
+        print(f"{name:<12} p50 {np.percentile(latencies, 50):8.1f} us   p99 {np.percentile(latencies, 99):8.1f} us")
+
+    scan_start = time.perf_counter()
+    orders.groupby(['Area', 'Weather'], observed=True)['Delay_Minutes'].describe()
+    scan = time.perf_counter() - scan_start
+    start = time.perf_counter()
+    heatmap = {area: index.drill_down('weather', area=area) for area in labels['area']}
+    print(f"\narea x weather table: index {(time.perf_counter() - start) * 1000:.2f} ms, "
+          f"pandas group-by {scan * 1000:.2f} ms")
+    print("\nRestaurant delay leaderboard (worst mean delay):")
+    print(index.drill_down('restaurant').sort_values('mean', ascending=False).head(10).round(2).to_string())
+    print(f"\nDelay by weather in {labels['area'][0]}:")
+    print(heatmap[labels['area'][0]].round(2).to_string())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+import argparse
+import logging
+import re
+import sys
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / 'common'))
+from dataset_loader import iter_dataset  # noqa: E402
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+AMOUNT = r'(?:Rs\.?|INR|₹)\s?(?P<{name}>\d[\d,]*(?:\.\d+)?)'
+OUTPUT_COLUMNS = ['id', 'timestamp', 'sender', 'amount', 'direction', 'purpose', 'channel', 'counterparty',
+                  'balance', 'reference', 'category', 'pattern']
+
+
+def amount(name: str = 'amount') -> str:
+    return AMOUNT.format(name=name)
+
+
+class SmsPattern:
+    # One message family: a cheap literal `anchor` preselects rows, then the compiled regex extracts named
+    # groups. `defaults` fills fields the wording implies (e.g. "You paid" is an outgoing UPI payment).
+    def __init__(self, name: str, anchor: str, regex: str, **defaults):
+        self.name = name
+        self.anchor = anchor
+        self.regex = re.compile(regex)
+        self.defaults = defaults
+
+
+PATTERNS = [
+    SmsPattern('account_debit', ' debited for ',
+               amount() + r' debited for (?P<purpose>[^.]+?)(?: via (?P<channel>NEFT|IMPS|RTGS|UPI))?'
+               r'(?: to (?P<counterparty>[^.]+))?\.(?: A/c bal: ' + amount('balance') + r')?',
+               direction='debit'),
+    SmsPattern('autopay_debit', ' debited towards ',
+               amount() + r' debited towards (?P<counterparty>[^.]+?)\.',
+               direction='debit', purpose='Subscription', channel='Autopay'),
+    SmsPattern('card_spend', ' spent at ',
+               amount() + r' spent at (?P<counterparty>[^.]+?)\.(?: Avl bal: (?:Rs\.?|INR|₹)?\s?'
+               r'(?P<balance>\d[\d,]*(?:\.\d+)?))?',
+               direction='debit', channel='Card'),
+    SmsPattern('upi_payment', 'You paid ',
+               r'You paid ' + amount() + r' to (?P<counterparty>[^.]+?)\.(?: UPI Ref:? (?P<reference>\d+))?',
+               direction='debit', channel='UPI'),
+    SmsPattern('account_credit', ' credited ',
+               amount() + r' (?:has been )?credited to (?:your )?(?:A/c|account)[^.]*?'
+               r'(?: by (?P<counterparty>[^.]+?))?\.(?:.*?(?:bal|Bal)[a-z.]*:? ' + amount('balance') + r')?',
+               direction='credit'),
+    SmsPattern('upi_received', 'received ',
+               r'(?:You have )?received ' + amount() + r' from (?P<counterparty>[^.]+?)\.'
+               r'(?: UPI Ref:? (?P<reference>\d+))?',
+               direction='credit', channel='UPI'),
+]
+
+# Keyword -> expense category, matched case-insensitively against purpose and counterparty
+CATEGORY_KEYWORDS = [
+    ('rent', 'Housing'),
+    ('electricity', 'Bills'), ('water', 'Bills'), ('gas', 'Bills'), ('recharge', 'Bills'),
+    ('netflix', 'Subscriptions'), ('prime', 'Subscriptions'), ('spotify', 'Subscriptions'),
+    ('uber', 'Travel'), ('ola', 'Travel'), ('irctc', 'Travel'),
+    ('swiggy', 'Food'), ('zomato', 'Food'),
+    ('amazon', 'Shopping'), ('flipkart', 'Shopping'),
+    ('emi', 'Loans'), ('loan', 'Loans'),
+    ('salary', 'Income'),
+]
+CATEGORY_RE = re.compile(r'\b(' + '|'.join(keyword for keyword, _ in CATEGORY_KEYWORDS) + r')\b',
+                         re.IGNORECASE)
+CATEGORY_BY_KEYWORD = dict(CATEGORY_KEYWORDS)
+
+
+def to_number(values: pd.Series) -> pd.Series:
+    return pd.to_numeric(values.str.replace(',', '', regex=False), errors='coerce')
+
+
+def categorize(purpose: pd.Series, counterparty: pd.Series) -> pd.Series:
+    text = purpose.fillna('') + ' ' + counterparty.fillna('')
+    keyword = text.str.extract(CATEGORY_RE, expand=False).str.lower()
+    return keyword.map(CATEGORY_BY_KEYWORD).fillna('Other')
+
+
+def parse_messages(messages: pd.Series) -> pd.DataFrame:
+    # Each pattern runs vectorised over the rows its anchor selects and that no earlier pattern claimed
+    messages = messages.fillna('').astype(str)
+    pending = np.ones(len(messages), dtype=bool)
+    parts = []
+    for pattern in PATTERNS:
+        candidates = pending & messages.str.contains(pattern.anchor, regex=False).to_numpy()
+        if not candidates.any():
+            continue
+        extracted = messages[candidates].str.extract(pattern.regex)
+        extracted = extracted[extracted['amount'].notna()]
+        if extracted.empty:
+            continue
+        for column, value in pattern.defaults.items():
+            extracted[column] = extracted[column].fillna(value) if column in extracted else value
+        extracted['pattern'] = pattern.name
+        parts.append(extracted)
+        pending[messages.index.get_indexer(extracted.index)] = False
+
+    result = pd.concat(parts) if parts else pd.DataFrame(index=messages.index[:0])
+    result = result.reindex(index=messages.index, columns=OUTPUT_COLUMNS[3:])
+    result['amount'] = to_number(result['amount'].astype('string'))
+    result['balance'] = to_number(result['balance'].astype('string'))
+    for column in ('purpose', 'channel', 'counterparty'):
+        result[column] = result[column].astype('string').str.strip()
+    category = categorize(result['purpose'], result['counterparty'])
+    result['category'] = category.where(result['pattern'].notna())
+    # Card and UPI messages only name the merchant; their purpose is the merchant's category
+    result['purpose'] = result['purpose'].fillna(result['category'])
+    return result
+
+
+def parse_frame(frame: pd.DataFrame) -> Tuple[pd.DataFrame, Dict[str, List[float]]]:
+    # Per-sender timing: each sender's messages are parsed as one vectorised batch
+    parts, stats = [], {}
+    for sender, group in frame.groupby('sender', observed=True, sort=False):
+        start = time.perf_counter()
+        parsed = parse_messages(group['message'])
+        elapsed = time.perf_counter() - start
+        parts.append(pd.concat([group[['id', 'timestamp', 'sender']], parsed], axis=1))
+        stats[str(sender)] = [len(group), int(parsed['pattern'].notna().sum()), elapsed]
+    if not parts:
+        return pd.DataFrame(columns=OUTPUT_COLUMNS + ['message']), stats
+    out = pd.concat(parts).sort_index()
+    out['message'] = frame.loc[out.index, 'message']
+    return out, stats
+
+
+def parse_chunks(chunks: Iterable[pd.DataFrame], n_jobs: int = 1):
+    if n_jobs <= 1:
+        for chunk in chunks:
+            yield parse_frame(chunk)
+        return
+    with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+        # Bounded look-ahead keeps memory flat however large the inbox is
+        pending = []
+        for chunk in chunks:
+            pending.append(pool.submit(parse_frame, chunk))
+            if len(pending) >= 2 * n_jobs:
+                yield pending.pop(0).result()
+        for future in pending:
+            yield future.result()
+
+
+def parse_inbox(csv_path: Optional[str] = None, output_path: str = 'sms_transactions.csv',
+                unparsed_path: str = 'sms_unparsed.csv', chunksize: int = 200000, n_jobs: int = 1
+                ) -> Dict[str, List[float]]:
+    sender_stats = defaultdict(lambda: [0, 0, 0.0])
+    total = parsed_total = 0
+    start = time.perf_counter()
+    first = True
+    for parsed, stats in parse_chunks(iter_dataset('fintrack_sms', csv_path, chunksize), n_jobs):
+        ok = parsed['pattern'].notna()
+        parsed.loc[ok, OUTPUT_COLUMNS].to_csv(output_path, mode='w' if first else 'a', header=first, index=False)
+        parsed.loc[~ok, ['id', 'timestamp', 'sender', 'message']].to_csv(
+            unparsed_path, mode='w' if first else 'a', header=first, index=False)
+        first = False
+        total += len(parsed)
+        parsed_total += int(ok.sum())
+        for sender, (messages, parsed_count, seconds) in stats.items():
+            sender_stats[sender][0] += messages
+            sender_stats[sender][1] += parsed_count
+            sender_stats[sender][2] += seconds
+    elapsed = time.perf_counter() - start
+    if total:
+        logger.info(f"Parsed {parsed_total}/{total} messages ({parsed_total / total:.2%}) in {elapsed:.2f}s "
+                    f"({total / elapsed:.0f} msgs/sec, {n_jobs} process(es))")
+        logger.info(f"Transactions written to {output_path}; {total - parsed_total} unparsed in {unparsed_path}")
+    return dict(sender_stats)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract transactions from FinTrack360 SMS messages")
+    parser.add_argument('--input', help="SMS CSV (id,timestamp,sender,message); defaults to the bundled dataset")
+    parser.add_argument('--output', default='sms_transactions.csv')
+    parser.add_argument('--unparsed', default='sms_unparsed.csv')
+    parser.add_argument('--chunksize', type=int, default=200000)
+    parser.add_argument('--n-jobs', type=int, default=1)
+    args = parser.parse_args()
+
+    stats = parse_inbox(args.input, args.output, args.unparsed, args.chunksize, args.n_jobs)
+    print(f"\n{'sender':<12} {'messages':>10} {'parsed':>8} {'msgs/sec':>12}")
+    for sender, (messages, parsed, seconds) in sorted(stats.items(), key=lambda kv: -kv[1][0]):
+        print(f"{sender:<12} {messages:>10} {parsed / messages:>8.1%} {messages / seconds if seconds else 0:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
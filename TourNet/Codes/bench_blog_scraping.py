@@ -0,0 +1,107 @@
+import argparse
+import importlib.util
+import logging
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import List, Tuple
+
+CODES_DIR = Path(__file__).resolve().parent
+
+STUB_PAGE = """<html><head><title>Stub travel blog</title></head><body>
+<article><h2>Three days in Lisbon</h2><p>Our travel guide to the best trip itinerary in Lisbon. #travel #lisbon</p></article>
+<article><h2>Packing list</h2><p>Everything we take on every journey, from cables to snacks. #packing</p></article>
+</body></html>""".encode('utf-8')
+
+
+def load_collector_module():
+    # The collector script name contains hyphens, so it cannot be imported the usual way
+    spec = importlib.util.spec_from_file_location('travel_trend_data_collection',
+                                                  CODES_DIR / 'travel-trend-data-collection.py')
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def make_handler(latency: float, body: bytes = STUB_PAGE):
+    class StubBlogHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            time.sleep(latency)
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return StubBlogHandler
+
+
+def start_stub_servers(count: int, latency: float) -> List[Tuple[ThreadingHTTPServer, str]]:
+    # One server per simulated host, so per-host politeness limits apply as they would in production
+    servers = []
+    for _ in range(count):
+        server = ThreadingHTTPServer(('127.0.0.1', 0), make_handler(latency))
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append((server, f"http://127.0.0.1:{server.server_address[1]}"))
+    return servers
+
+
+def build_urls(bases: List[str], count: int) -> List[str]:
+    return [f"{bases[i % len(bases)]}/post/{i}" for i in range(count)]
+
+
+def run(url_counts: List[int], hosts: int, latency: float, delay: float, workers: int, per_host: int):
+    module = load_collector_module()
+    logging.getLogger().setLevel(logging.WARNING)
+    servers = start_stub_servers(hosts, latency)
+    bases = [base for _, base in servers]
+
+    print(f"{'urls':>6} {'sequential_s':>13} {'concurrent_s':>13} {'speedup':>8} {'records':>8}")
+    try:
+        for count in url_counts:
+            urls = build_urls(bases, count)
+
+            sequential = module.TravelDataCollector(request_delay=delay)
+            start = time.perf_counter()
+            seq_records = []
+            for url in urls:
+                seq_records.extend(sequential.scrape_blog_simple(url))
+                time.sleep(delay)
+            seq_elapsed = time.perf_counter() - start
+
+            concurrent = module.TravelDataCollector(max_workers=workers, per_host_limit=per_host,
+                                                    request_delay=delay)
+            start = time.perf_counter()
+            con_records = concurrent.scrape_blogs_concurrent(urls)
+            con_elapsed = time.perf_counter() - start
+
+            strip = lambda records: [{k: v for k, v in r.items() if k != 'timestamp'} for r in records]
+            assert strip(seq_records) == strip(con_records), "concurrent mode changed the scraped records"
+            print(f"{count:>6} {seq_elapsed:>13.2f} {con_elapsed:>13.2f} "
+                  f"{seq_elapsed / con_elapsed:>7.1f}x {len(con_records):>8}")
+    finally:
+        for server, _ in servers:
+            server.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sequential vs concurrent blog scraping against local stub servers")
+    parser.add_argument('--urls', type=int, nargs='+', default=[10, 50, 100, 200])
+    parser.add_argument('--hosts', type=int, default=20, help="number of simulated blog hosts")
+    parser.add_argument('--latency', type=float, default=0.1, help="server response latency in seconds")
+    parser.add_argument('--delay', type=float, default=0.0, help="politeness delay between requests to a host")
+    parser.add_argument('--workers', type=int, default=16)
+    parser.add_argument('--per-host', type=int, default=2)
+    args = parser.parse_args()
+    run(args.urls, args.hosts, args.latency, args.delay, args.workers, args.per_host)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import List, Tuple
+
+import numpy as np
+import requests
+import tweepy
+
+from synthetic_data import SocialPostProfile
+
+FIXTURE_DIR = Path(__file__).resolve().parent.parent / 'Datasets' / 'blog_fixtures'
+
+
+def load_fixture_pages(fixture_dir: Path = FIXTURE_DIR) -> List[bytes]:
+    return [path.read_bytes() for path in sorted(fixture_dir.glob('*.html'))]
+
+
+def make_fixture_handler(latency: float, pages: List[bytes]):
+    # Serves the recorded blog pages; the last path segment picks the page, so URL lists cycle through them
+    class FixtureBlogHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            time.sleep(latency)
+            segment = self.path.rstrip('/').rsplit('/', 1)[-1]
+            body = pages[int(segment) % len(pages) if segment.isdigit() else 0]
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return FixtureBlogHandler
+
+
+def start_fixture_servers(count: int, latency: float, pages: List[bytes] = None
+                          ) -> List[Tuple[ThreadingHTTPServer, str]]:
+    handler = make_fixture_handler(latency, pages or load_fixture_pages())
+    servers = []
+    for _ in range(count):
+        server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append((server, f"http://127.0.0.1:{server.server_address[1]}"))
+    return servers
+
+
+def too_many_requests(reset_epoch: float) -> tweepy.TooManyRequests:
+    response = requests.Response()
+    response.status_code = 429
+    response.reason = 'Too Many Requests'
+    response.headers['x-rate-limit-reset'] = str(int(reset_epoch))
+    response._content = b'{"title": "Too Many Requests", "detail": "Too Many Requests"}'
+    return tweepy.TooManyRequests(response)
+
+
+class FakeTwitterClient:
+    # Stands in for tweepy.Client.search_recent_tweets: pages of synthetic tweets after `latency` seconds, and a
+    # 429 every `rate_limit_every` calls whose reset lies `reset_seconds` ahead
+    def __init__(self, latency: float = 0.05, rate_limit_every: int = 0, reset_seconds: float = 1.0,
+                 total_tweets: int = 10000, profile: SocialPostProfile = None, seed: int = 0):
+        self.latency = latency
+        self.rate_limit_every = rate_limit_every
+        self.reset_seconds = reset_seconds
+        self.total_tweets = total_tweets
+        self.profile = profile or SocialPostProfile()
+        self.seed = seed
+        self.calls = 0
+        self.rate_limited = 0
+        self._lock = threading.Lock()
+
+    def _tweet(self, tweet_id: int, row) -> tweepy.Tweet:
+        created = datetime(2025, 1, 1, tzinfo=timezone.utc) + timedelta(seconds=tweet_id)
+        engagement = int(row.engagement)
+        return tweepy.Tweet({
+            'id': str(tweet_id),
+            'text': row.post,
+            'edit_history_tweet_ids': [str(tweet_id)],
+            'author_id': str(zlib.crc32(row.username.encode('utf-8'))),
+            'created_at': created.strftime('%Y-%m-%dT%H:%M:%S.000Z'),
+            'public_metrics': {'like_count': engagement, 'retweet_count': engagement // 10,
+                               'reply_count': engagement // 50, 'quote_count': 0},
+            'entities': {'hashtags': [{'tag': tag.strip().lstrip('#')} for tag in row.hashtags.split(',') if tag]},
+        })
+
+    def search_recent_tweets(self, query: str, next_token: str = None, max_results: int = 10, since_id=None,
+                             **kwargs) -> tweepy.Response:
+        with self._lock:
+            self.calls += 1
+            limited = self.rate_limit_every and self.calls % self.rate_limit_every == 0
+            if limited:
+                self.rate_limited += 1
+        time.sleep(self.latency)
+        if limited:
+            raise too_many_requests(time.time() + self.reset_seconds)
+
+        # Newest first, as the API returns them; since_id stops pagination at previously collected tweets
+        offset = int(next_token or 0)
+        newest = self.total_tweets
+        oldest = max(int(since_id or 0), newest - offset - max_results)
+        ids = np.arange(newest - offset, oldest, -1)
+        if not len(ids):
+            return tweepy.Response([], {}, [], {'result_count': 0})
+        rows = self.profile.frame(len(ids), seed=self.seed + offset)
+        data = [self._tweet(int(tweet_id), row) for tweet_id, row in zip(ids, rows.itertuples())]
+        meta = {'result_count': len(data), 'newest_id': str(ids[0]), 'oldest_id': str(ids[-1])}
+        if oldest > int(since_id or 0):
+            meta['next_token'] = str(offset + len(ids))
+        return tweepy.Response(data, {}, [], meta)
@@ -0,0 +1,67 @@
+import argparse
+import time
+from pathlib import Path
+from typing import List
+
+from html_parsers import get_parser_backend
+
+FIXTURES_DIR = Path(__file__).resolve().parent.parent / 'Datasets' / 'blog_fixtures'
+
+
+def original_extract_posts(html: str):
+    # The pre-backend scrape_blog_simple logic, kept verbatim as the correctness baseline
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, 'html.parser')
+    for selector in ['article', '.post', '.blog-post', '.entry']:
+        elements = soup.select(selector)
+        if elements:
+            posts = []
+            for elem in elements[:5]:
+                title = elem.find(['h1', 'h2', 'h3'])
+                title_text = title.get_text(strip=True) if title else "No title"
+                posts.append((title_text, elem.get_text(strip=True)[:500]))
+            return posts
+    return []
+
+
+def pages_per_second(extract, pages: List[str], min_seconds: float) -> float:
+    count = 0
+    start = time.perf_counter()
+    while True:
+        for html in pages:
+            extract(html)
+        count += len(pages)
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_seconds:
+            return count / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare blog parser backends over saved HTML fixtures")
+    parser.add_argument('--fixtures', type=Path, default=FIXTURES_DIR)
+    parser.add_argument('--backends', nargs='+', default=['bs4/html.parser', 'bs4/lxml', 'lxml'])
+    parser.add_argument('--seconds', type=float, default=2.0, help="minimum timing duration per backend")
+    args = parser.parse_args()
+
+    fixtures = {path.name: path.read_text(encoding='utf-8') for path in sorted(args.fixtures.glob('*.html'))}
+    expected = {name: original_extract_posts(html) for name, html in fixtures.items()}
+    pages = list(fixtures.values())
+
+    baseline = pages_per_second(original_extract_posts, pages, args.seconds)
+    print(f"{'backend':<18} {'pages/sec':>10} {'speedup':>8}  output")
+    print(f"{'original':<18} {baseline:>10.1f} {1.0:>7.1f}x  baseline")
+    for name in args.backends:
+        try:
+            backend = get_parser_backend(name)
+        except Exception as e:
+            print(f"{name:<18} {'-':>10} {'-':>8}  unavailable ({e})")
+            continue
+        mismatches = [fixture for fixture, html in fixtures.items()
+                      if backend.extract_posts(html) != expected[fixture]]
+        rate = pages_per_second(backend.extract_posts, pages, args.seconds)
+        status = 'identical' if not mismatches else f"differs on {', '.join(mismatches)}"
+        print(f"{backend.name:<18} {rate:>10.1f} {rate / baseline:>7.1f}x  {status}")
+
+
+if __name__ == "__main__":
+    main()
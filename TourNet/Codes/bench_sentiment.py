@@ -0,0 +1,63 @@
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from ner import DEFAULT_INPUT
+from sentiment import POSITIVE_THRESHOLD, SentimentScorer, label_scores
+
+LABELS = ['Positive', 'Neutral', 'Negative']
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lexicon sentiment scorer: throughput and agreement with CSV labels")
+    parser.add_argument('--input', default=DEFAULT_INPUT)
+    parser.add_argument('--scale', type=int, default=20, help="repeat the posts this many times for throughput runs")
+    parser.add_argument('--n-jobs', type=int, default=4)
+    parser.add_argument('--holdout', type=float, default=0.3, help="share of labelled posts kept out of calibration")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.input, usecols=['post', 'location', 'sentiment'])
+    texts = df['post'].fillna('').astype(str).tolist()
+    corpus = texts * args.scale
+
+    print(f"{'scorer':<18} {'posts':>10} {'posts/sec':>12}")
+    for n_jobs in sorted({1, args.n_jobs}):
+        with SentimentScorer(n_jobs=n_jobs) as scorer:
+            scorer.score(corpus[:1000])  # start workers outside the timed run
+            start = time.perf_counter()
+            scorer.score(corpus)
+            elapsed = time.perf_counter() - start
+        print(f"{f'{n_jobs} process(es)':<18} {len(corpus):>10} {len(corpus) / elapsed:>12.0f}")
+
+    # The label threshold is the only tuned parameter: pick it on the calibration split, report on the held-out one
+    scores = pd.Series(SentimentScorer().score(texts), index=df.index)
+    reference = df['sentiment'].fillna('Neutral')
+    held_out = np.random.default_rng(args.seed).random(len(df)) < args.holdout
+    calibration = ~held_out
+    thresholds = np.round(np.arange(0.01, 0.61, 0.01), 2)
+    fitted = max(thresholds, key=lambda t: (label_scores(scores[calibration].to_numpy(), t)
+                                            == reference[calibration].to_numpy()).mean())
+    majority = reference[calibration].value_counts().idxmax()
+    test = reference[held_out]
+    print(f"\nHeld-out agreement with the `sentiment` column ({held_out.sum()} of {len(df)} posts):")
+    for name, threshold in (('default threshold', POSITIVE_THRESHOLD), ('calibrated threshold', fitted)):
+        labels = label_scores(scores[held_out].to_numpy(), threshold)
+        print(f"  {name:<22} {threshold:>5.2f}  {(labels == test.to_numpy()).mean():.1%}")
+    print(f"  {f'always-{majority} baseline':<22} {'':>5}  {(test == majority).mean():.1%}")
+    predicted = pd.Series(label_scores(scores.to_numpy(), fitted), index=df.index)
+    confusion = pd.crosstab(test, predicted[held_out], rownames=['label'], colnames=['predicted'])
+    print(confusion.reindex(index=LABELS, columns=LABELS, fill_value=0).to_string())
+
+    print("\nPositive share by destination (labels vs scorer):")
+    shares = pd.DataFrame({
+        'labels': reference.eq('Positive').groupby(df['location']).mean(),
+        'scorer': predicted.eq('Positive').groupby(df['location']).mean(),
+    })
+    print(shares.round(3).to_string())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+import argparse
+import logging
+import os
+import shutil
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Callable, List
+
+import pandas as pd
+
+from columnar_store import load_partitioned, write_partitioned
+from synthetic_data import synthetic_collector_frame
+
+
+def timed(fn: Callable) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def dir_size(path: str) -> int:
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    return sum(p.stat().st_size for p in Path(path).rglob('*') if p.is_file())
+
+
+def run(sizes: List[int], days: int):
+    work = tempfile.mkdtemp(prefix='tournet_storage_')
+    print(f"{'rows':>9} {'format':<8} {'size_mb':>8} {'write_s':>8} {'load_all_s':>11} {'load_slice_s':>13}")
+    try:
+        for rows in sizes:
+            df = synthetic_collector_frame(rows)
+            csv_path = os.path.join(work, f"{rows}.csv")
+            json_path = os.path.join(work, f"{rows}.json")
+            parquet_root = os.path.join(work, f"{rows}_parquet")
+
+            # Spread rows over several collection days, appended one run at a time as save_data would
+            day_chunks = [df.iloc[i::days] for i in range(days)]
+            parquet_write = timed(lambda: [write_partitioned(chunk, parquet_root, date(2025, 1, 1) + timedelta(d))
+                                           for d, chunk in enumerate(day_chunks)])
+            csv_write = timed(lambda: df.to_csv(csv_path, index=False))
+            json_write = timed(lambda: df.to_json(json_path, orient='records', indent=2))
+
+            # Slice query: Twitter engagement for the last two collection days
+            last_days = (str(date(2025, 1, 1) + timedelta(days - 2)), str(date(2025, 1, 1) + timedelta(days - 1)))
+            csv_slice = timed(lambda: pd.read_csv(csv_path, usecols=['platform', 'username', 'engagement'])
+                              .query("platform == 'Twitter'"))
+            json_slice = timed(lambda: pd.read_json(json_path)
+                               .query("platform == 'Twitter'")[['username', 'engagement']])
+            parquet_slice = timed(lambda: load_partitioned(parquet_root, columns=['username', 'engagement'],
+                                                           platforms=['Twitter'], start_date=last_days[0],
+                                                           end_date=last_days[1]))
+
+            for name, path, write_s, load_all, load_slice in (
+                ('csv', csv_path, csv_write, timed(lambda: pd.read_csv(csv_path)), csv_slice),
+                ('json', json_path, json_write, timed(lambda: pd.read_json(json_path)), json_slice),
+                ('parquet', parquet_root, parquet_write, timed(lambda: load_partitioned(parquet_root)),
+                 parquet_slice),
+            ):
+                print(f"{rows:>9} {name:<8} {dir_size(path) / 1e6:>8.2f} {write_s:>8.2f} {load_all:>11.2f} "
+                      f"{load_slice:>13.3f}")
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CSV/JSON vs partitioned Parquet: size and load time")
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000, 100000, 500000])
+    parser.add_argument('--days', type=int, default=7, help="collection days to partition the rows over")
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.WARNING)
+    run(args.rows, args.days)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+import argparse
+import json
+import logging
+import os
+import platform
+import shutil
+import subprocess
+import tempfile
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import pandas as pd
+import tweepy
+
+from bench_blog_scraping import build_urls, load_collector_module
+from bench_fixtures import FakeTwitterClient, start_fixture_servers
+from near_dedup import NearDuplicateFilter
+from rate_limiter import RateLimitScheduler
+from record_pipeline import DEDUP_MAX_KEYS, normalize_records
+from summary_stats import SummaryAggregator
+from synthetic_data import SocialPostProfile, social_to_collector_frame, write_social_csv
+
+DEFAULT_HISTORY = 'bench_history.jsonl'
+SIZED_STAGES = ['dedup', 'ner', 'summary', 'save_data']
+STAGES = ['scrape_blogs', 'scrape_twitter'] + SIZED_STAGES
+
+
+def result(stage: str, rows: Optional[int], items: int, seconds: float, **extra) -> Dict:
+    return {'stage': stage, 'rows': rows, 'items': items, 'seconds': round(seconds, 4),
+            'rate': round(items / seconds, 1) if seconds else 0.0, **extra}
+
+
+def bench_scrape_blogs(module, args) -> Dict:
+    servers = start_fixture_servers(args.hosts, args.latency)
+    try:
+        collector = module.TravelDataCollector(max_workers=args.workers, per_host_limit=args.per_host,
+                                               request_delay=0.0)
+        urls = build_urls([base for _, base in servers], args.urls)
+        start = time.perf_counter()
+        posts = collector.scrape_blogs_concurrent(urls)
+        return result('scrape_blogs', None, len(urls), time.perf_counter() - start, records=len(posts))
+    finally:
+        for server, _ in servers:
+            server.shutdown()
+
+
+def bench_scrape_twitter(module, args, profile: SocialPostProfile) -> Dict:
+    client = FakeTwitterClient(latency=args.latency, rate_limit_every=args.rate_limit_every,
+                               reset_seconds=args.reset_seconds, total_tweets=args.tweets, profile=profile)
+    # The API budget is generous here so the run measures 429 handling, not the real 450 requests / 15 min
+    limiter = RateLimitScheduler(requests_per_window=100000, window_seconds=900, base_backoff=0.05,
+                                 max_backoff=0.5, retry_on=(tweepy.TooManyRequests, tweepy.TwitterServerError))
+    collector = module.TravelDataCollector(tweepy_client=client, rate_limiter=limiter)
+    start = time.perf_counter()
+    tweets = list(collector.iter_records(tweet_limit=args.tweets, concurrent=True))
+    return result('scrape_twitter', None, len(tweets), time.perf_counter() - start, api_calls=client.calls,
+                  rate_limited=client.rate_limited, retries=limiter.stats['retries'])
+
+
+def iter_collector_chunks(csv_path: str, chunksize: int):
+    for chunk in pd.read_csv(csv_path, chunksize=chunksize):
+        yield social_to_collector_frame(chunk)
+
+
+def bench_dedup(csv_path: str, rows: int, args) -> Dict:
+    dedup = NearDuplicateFilter(args.dedup_threshold)
+    elapsed = kept = 0
+    for frame in iter_collector_chunks(csv_path, args.chunksize):
+        records = frame.to_dict('records')
+        start = time.perf_counter()
+        kept += sum(1 for _ in dedup.filter(normalize_records(records, args.dedup_max_keys)))
+        elapsed += time.perf_counter() - start
+    return result('dedup', rows, rows, elapsed, kept=kept)
+
+
+def load_benchmark_nlp(model: str):
+    # Falls back to a rule-based pipeline so the NER stage still runs offline; the stage name records which one
+    from ner import load_nlp
+    try:
+        return load_nlp(model), model
+    except OSError:
+        import spacy
+        profile = SocialPostProfile()
+        nlp = spacy.blank('en')
+        ruler = nlp.add_pipe('entity_ruler')
+        ruler.add_patterns([{'label': 'GPE', 'pattern': place} for place in profile.destinations])
+        return nlp, 'blank_en_ruler'
+
+
+def bench_ner(csv_path: str, rows: int, args, work: str) -> Dict:
+    from ner import run_ner
+    nlp, model = load_benchmark_nlp(args.model)
+    ner_rows = min(rows, args.ner_rows)
+    ner_csv = csv_path
+    if ner_rows < rows:
+        ner_csv = os.path.join(work, f"ner_{ner_rows}.csv")
+        pd.read_csv(csv_path, nrows=ner_rows).to_csv(ner_csv, index=False)
+    start = time.perf_counter()
+    counts = run_ner(nlp, ner_csv, chunksize=args.chunksize, batch_size=args.batch_size)
+    return result(f'ner[{model}]', rows, ner_rows, time.perf_counter() - start, locations=sum(counts.values()))
+
+
+def bench_summary(csv_path: str, rows: int, args) -> Dict:
+    summary = SummaryAggregator()
+    elapsed = 0
+    for frame in iter_collector_chunks(csv_path, args.chunksize):
+        start = time.perf_counter()
+        summary.update_frame(frame)
+        elapsed += time.perf_counter() - start
+    return result('summary', rows, summary.total, elapsed, hashtags=len(summary.hashtag_counts))
+
+
+def bench_save_data(module, csv_path: str, rows: int, args, work: str) -> List[Dict]:
+    frame_rows = min(rows, args.max_frame_rows)
+    df = social_to_collector_frame(pd.read_csv(csv_path, nrows=frame_rows))
+    collector = module.TravelDataCollector()
+    results = []
+    for output_format in ('csv', 'parquet'):
+        start = time.perf_counter()
+        try:
+            collector.save_data(df, os.path.join(work, f"save_{rows}_{output_format}"), output_format)
+        except ImportError as e:
+            print(f"Skipping save_data[{output_format}]: {e}")
+            continue
+        results.append(result(f'save_data[{output_format}]', rows, frame_rows, time.perf_counter() - start))
+    return results
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_previous(history_path: str, host: str) -> Optional[Dict]:
+    if not os.path.exists(history_path):
+        return None
+    previous = None
+    with open(history_path, encoding='utf-8') as f:
+        for line in f:
+            entry = json.loads(line)
+            if entry.get('host') == host:
+                previous = entry
+    return previous
+
+
+def report(results: List[Dict], previous: Optional[Dict], tolerance: float) -> List[Dict]:
+    # Rates are compared against the last run on the same host; a drop beyond `tolerance` is a regression
+    before = {(r['stage'], r['rows']): r for r in (previous or {}).get('results', [])}
+    regressions = []
+    print(f"\n{'stage':<26} {'rows':>10} {'items':>10} {'seconds':>9} {'rate/s':>12} {'prev rate/s':>12} "
+          f"{'change':>8}")
+    for entry in results:
+        old = before.get((entry['stage'], entry['rows']))
+        change = ''
+        if old and old['rate']:
+            ratio = entry['rate'] / old['rate'] - 1
+            change = f"{ratio:+.1%}"
+            if ratio < -tolerance:
+                regressions.append(entry)
+                change += ' !'
+        rows = entry['rows'] if entry['rows'] is not None else '-'
+        print(f"{entry['stage']:<26} {rows:>10} {entry['items']:>10} {entry['seconds']:>9.3f} "
+              f"{entry['rate']:>12.1f} {old['rate'] if old else '-':>12} {change:>8}")
+    return regressions
+
+
+def run(args) -> List[Dict]:
+    module = load_collector_module()
+    logging.getLogger().setLevel(logging.WARNING)
+    logging.getLogger('rate_limiter').setLevel(logging.ERROR)  # the simulated 429s are expected
+    profile = SocialPostProfile(args.input)
+    stages = args.stages
+    results = []
+
+    if 'scrape_blogs' in stages:
+        results.append(bench_scrape_blogs(module, args))
+    if 'scrape_twitter' in stages:
+        results.append(bench_scrape_twitter(module, args, profile))
+
+    work = tempfile.mkdtemp(prefix='tournet_bench_')
+    try:
+        for rows in args.sizes if set(stages) & set(SIZED_STAGES) else []:
+            csv_path = os.path.join(work, f"social_{rows}.csv")
+            start = time.perf_counter()
+            write_social_csv(csv_path, rows, profile, args.chunksize)
+            print(f"Generated {rows} synthetic posts in {time.perf_counter() - start:.1f}s")
+            if 'dedup' in stages:
+                results.append(bench_dedup(csv_path, rows, args))
+            if 'ner' in stages:
+                results.append(bench_ner(csv_path, rows, args, work))
+            if 'summary' in stages:
+                results.append(bench_summary(csv_path, rows, args))
+            if 'save_data' in stages:
+                results.extend(bench_save_data(module, csv_path, rows, args, work))
+            os.remove(csv_path)
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline TourNet pipeline benchmarks with run-to-run comparison")
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=STAGES)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[5000, 100000],
+                        help="synthetic post counts, e.g. 5000 100000 1000000 10000000")
+    parser.add_argument('--input', default='TourNet/Datasets/tournet_social_data.csv',
+                        help="CSV the synthetic posts are modelled on")
+    parser.add_argument('--chunksize', type=int, default=100000)
+    parser.add_argument('--urls', type=int, default=200)
+    parser.add_argument('--hosts', type=int, default=20)
+    parser.add_argument('--workers', type=int, default=16)
+    parser.add_argument('--per-host', type=int, default=2)
+    parser.add_argument('--latency', type=float, default=0.02, help="seconds per fixture response")
+    parser.add_argument('--tweets', type=int, default=1000, help="tweets per hashtag from the fake client")
+    parser.add_argument('--rate-limit-every', type=int, default=5, help="answer every Nth API call with a 429")
+    parser.add_argument('--reset-seconds', type=float, default=1.0)
+    parser.add_argument('--dedup-threshold', type=float, default=0.8)
+    parser.add_argument('--dedup-max-keys', type=int, default=DEDUP_MAX_KEYS,
+                        help="exact-dedup window: a post repeated after this many newer unique posts is kept again")
+    parser.add_argument('--model', default='en_core_web_sm')
+    parser.add_argument('--batch-size', type=int, default=256)
+    parser.add_argument('--ner-rows', type=int, default=20000, help="cap on posts sent through NER per size")
+    parser.add_argument('--max-frame-rows', type=int, default=2_000_000,
+                        help="cap on rows held in memory for save_data")
+    parser.add_argument('--history', default=DEFAULT_HISTORY)
+    parser.add_argument('--tolerance', type=float, default=0.15, help="allowed throughput drop before flagging")
+    parser.add_argument('--no-record', action='store_true', help="compare only, do not append to the history")
+    args = parser.parse_args()
+
+    results = run(args)
+    host = platform.node()
+    regressions = report(results, load_previous(args.history, host), args.tolerance)
+    if not args.no_record:
+        entry = {'run_at': datetime.now().isoformat(timespec='seconds'), 'commit': git_commit(), 'host': host,
+                 'python': platform.python_version(), 'config': vars(args), 'results': results}
+        with open(args.history, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry) + '\n')
+        print(f"\nResults appended to {args.history}")
+    if regressions:
+        print(f"{len(regressions)} stage(s) slower than the previous run by more than {args.tolerance:.0%}: "
+              f"{', '.join(entry['stage'] for entry in regressions)}")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
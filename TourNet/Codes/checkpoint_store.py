@@ -0,0 +1,136 @@
+import json
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS seen_tweets (tweet_id INTEGER PRIMARY KEY);
+CREATE TABLE IF NOT EXISTS hashtag_state (hashtag TEXT PRIMARY KEY, since_id INTEGER);
+CREATE TABLE IF NOT EXISTS url_state (
+    url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, fetched_at TEXT
+);
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY AUTOINCREMENT, started_at TEXT, finished_at TEXT
+);
+CREATE TABLE IF NOT EXISTS run_tasks (
+    run_id INTEGER, task TEXT, records TEXT, state TEXT, PRIMARY KEY (run_id, task)
+);
+"""
+
+
+class CheckpointStore:
+    # SQLite-backed state shared by collector threads: seen tweet IDs, per-hashtag since_id,
+    # per-URL cache validators and the tasks already finished by an unfinished run. A task's seen IDs, since_id
+    # and validators are staged with its records and only applied by finish_run, once the run's output is saved;
+    # until then a resumed run restores the records instead of skipping them as already seen.
+    def __init__(self, path: str = 'tournet_state.sqlite'):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.executescript(SCHEMA)
+        columns = {row[1] for row in self._conn.execute('PRAGMA table_info(run_tasks)')}
+        if 'state' not in columns:
+            self._conn.execute('ALTER TABLE run_tasks ADD COLUMN state TEXT')
+        self._lock = threading.Lock()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def filter_unseen(self, tweet_ids: Iterable[int]) -> Set[int]:
+        ids = set(tweet_ids)
+        if not ids:
+            return ids
+        with self._lock:
+            seen = set()
+            id_list = list(ids)
+            for i in range(0, len(id_list), 500):
+                chunk = id_list[i:i + 500]
+                rows = self._conn.execute(
+                    f"SELECT tweet_id FROM seen_tweets WHERE tweet_id IN ({','.join('?' * len(chunk))})", chunk
+                )
+                seen.update(row[0] for row in rows)
+        return ids - seen
+
+    def mark_seen(self, tweet_ids: Iterable[int]):
+        with self._lock, self._conn:
+            self._mark_seen(tweet_ids)
+
+    def _mark_seen(self, tweet_ids: Iterable[int]):
+        self._conn.executemany('INSERT OR IGNORE INTO seen_tweets VALUES (?)', ((i,) for i in tweet_ids))
+
+    def get_since_id(self, hashtag: str) -> Optional[int]:
+        with self._lock:
+            row = self._conn.execute('SELECT since_id FROM hashtag_state WHERE hashtag = ?', (hashtag,)).fetchone()
+        return row[0] if row else None
+
+    def set_since_id(self, hashtag: str, since_id: int):
+        with self._lock, self._conn:
+            self._set_since_id(hashtag, since_id)
+
+    def _set_since_id(self, hashtag: str, since_id: int):
+        self._conn.execute(
+            'INSERT INTO hashtag_state VALUES (?, ?) ON CONFLICT(hashtag) '
+            'DO UPDATE SET since_id = MAX(since_id, excluded.since_id)', (hashtag, since_id)
+        )
+
+    def get_validators(self, url: str) -> Dict[str, str]:
+        with self._lock:
+            row = self._conn.execute('SELECT etag, last_modified FROM url_state WHERE url = ?', (url,)).fetchone()
+        headers = {}
+        if row and row[0]:
+            headers['If-None-Match'] = row[0]
+        if row and row[1]:
+            headers['If-Modified-Since'] = row[1]
+        return headers
+
+    def set_validators(self, url: str, etag: Optional[str], last_modified: Optional[str]):
+        with self._lock, self._conn:
+            self._set_validators(url, etag, last_modified)
+
+    def _set_validators(self, url: str, etag: Optional[str], last_modified: Optional[str]):
+        self._conn.execute(
+            'INSERT OR REPLACE INTO url_state VALUES (?, ?, ?, ?)',
+            (url, etag, last_modified, datetime.now().isoformat())
+        )
+
+    def begin_run(self) -> int:
+        # Resume the latest run if it never finished, otherwise start a new one
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                'SELECT run_id FROM runs WHERE finished_at IS NULL ORDER BY run_id DESC LIMIT 1'
+            ).fetchone()
+            if row:
+                return row[0]
+            cursor = self._conn.execute('INSERT INTO runs (started_at) VALUES (?)', (datetime.now().isoformat(),))
+            return cursor.lastrowid
+
+    def completed_tasks(self, run_id: int) -> Dict[str, List[Dict]]:
+        with self._lock:
+            rows = self._conn.execute('SELECT task, records FROM run_tasks WHERE run_id = ?', (run_id,)).fetchall()
+        return {task: json.loads(records) for task, records in rows}
+
+    def complete_task(self, run_id: int, task: str, records: List[Dict], state: Optional[Dict] = None):
+        # state: {'seen': [tweet ids], 'since_id': {hashtag: id}, 'validators': {url: [etag, last_modified]}}
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO run_tasks VALUES (?, ?, ?, ?)',
+                (run_id, task, json.dumps(records, default=str), json.dumps(state or {}))
+            )
+
+    def finish_run(self, run_id: int):
+        # Applies the staged state of every task and closes the run in one transaction; call it after the run's
+        # output has been written
+        with self._lock, self._conn:
+            rows = self._conn.execute('SELECT state FROM run_tasks WHERE run_id = ?', (run_id,)).fetchall()
+            for (state,) in rows:
+                state = json.loads(state or '{}')
+                self._mark_seen(state.get('seen', []))
+                for hashtag, since_id in state.get('since_id', {}).items():
+                    self._set_since_id(hashtag, since_id)
+                for url, (etag, last_modified) in state.get('validators', {}).items():
+                    self._set_validators(url, etag, last_modified)
+            self._conn.execute('DELETE FROM run_tasks WHERE run_id = ?', (run_id,))
+            self._conn.execute('UPDATE runs SET finished_at = ? WHERE run_id = ?',
+                               (datetime.now().isoformat(), run_id))
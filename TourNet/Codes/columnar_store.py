@@ -0,0 +1,83 @@
+import uuid
+from datetime import date, datetime, timezone
+from typing import List, Optional, Union
+
+import pandas as pd
+
+from record_pipeline import utc_timestamps
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+PARTITION_COLUMNS = ['platform', 'collection_date']
+
+
+def record_schema():
+    return pa.schema([
+        ('post_text', pa.string()),
+        ('username', pa.string()),
+        ('timestamp', pa.timestamp('us', tz='UTC')),
+        ('hashtags', pa.list_(pa.string())),
+        ('location', pa.string()),
+        ('likes', pa.int64()),
+        ('retweets', pa.int64()),
+        ('replies', pa.int64()),
+        ('engagement', pa.int64()),
+        ('url', pa.string()),
+        ('search_hashtag', pa.string()),
+        ('post_length', pa.int32()),
+        ('hashtag_count', pa.int32()),
+        ('engagement_rate', pa.float64()),
+        ('sentiment_score', pa.float64()),
+        ('sentiment', pa.string()),
+        ('platform', pa.string()),
+        ('collection_date', pa.string()),
+    ])
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError("pyarrow is required for the Parquet output mode")
+
+
+def write_partitioned(df: pd.DataFrame, root: str, collection_date: Optional[date] = None) -> List[str]:
+    # Each call adds new files under root/platform=<p>/collection_date=<d>/ and never rewrites existing ones
+    _require_pyarrow()
+    frame = df.copy()
+    # Partitions use the UTC date, matching the UTC timestamps inside them
+    frame['collection_date'] = (collection_date or datetime.now(timezone.utc).date()).isoformat()
+    frame['timestamp'] = utc_timestamps(frame['timestamp'])
+    schema = record_schema()
+    schema = pa.schema([field for field in schema if field.name in frame.columns])
+    table = pa.Table.from_pandas(frame[schema.names], schema=schema, preserve_index=False)
+
+    written = []
+    pq.write_to_dataset(
+        table, root, partition_cols=PARTITION_COLUMNS,
+        basename_template=f"part-{datetime.now().strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:8]}-{{i}}.parquet",
+        existing_data_behavior='overwrite_or_ignore',
+        file_visitor=lambda written_file: written.append(written_file.path),
+    )
+    return written
+
+
+def load_partitioned(root: str, columns: Optional[List[str]] = None,
+                     platforms: Optional[List[str]] = None,
+                     start_date: Optional[Union[str, date]] = None,
+                     end_date: Optional[Union[str, date]] = None) -> pd.DataFrame:
+    # Partition filters prune whole directories; only the requested columns are decoded
+    _require_pyarrow()
+    dataset = ds.dataset(root, format='parquet', partitioning='hive')
+    condition = None
+    for clause in (
+        ds.field('platform').isin(platforms) if platforms else None,
+        ds.field('collection_date') >= str(start_date) if start_date else None,
+        ds.field('collection_date') <= str(end_date) if end_date else None,
+    ):
+        if clause is not None:
+            condition = clause if condition is None else condition & clause
+    return dataset.to_table(columns=columns, filter=condition).to_pandas()
@@ -0,0 +1,163 @@
+import argparse
+import logging
+import time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+DEFAULT_INPUT = "TourNet/Datasets/tournet_social_data.csv"
+# Destinations covered by the TourNet dataset; used when no destination list is given
+DEFAULT_DESTINATIONS = ['Amsterdam', 'Bali', 'Cape Town', 'Dharamshala', 'Manali', 'New York', 'Paris', 'Rome',
+                        'Santorini', 'Tokyo']
+# Common alternative spellings for destinations seen in TourNet data; extended by --aliases
+DEFAULT_ALIASES = {
+    'nyc': 'New York',
+    'new york city': 'New York',
+    'big apple': 'New York',
+    'roma': 'Rome',
+    'capetown': 'Cape Town',
+    'dharamsala': 'Dharamshala',
+    'mcleodganj': 'Dharamshala',
+}
+
+
+class GazetteerMatcher:
+    # Aho-Corasick automaton over lower-cased aliases. One pass per text finds every alias; matches must sit on
+    # word boundaries and overlapping matches resolve leftmost-longest ("New York City" beats "New York").
+    def __init__(self, aliases: Dict[str, str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[int, str]]] = [[]]
+        for alias, canonical in aliases.items():
+            self._add(alias.lower(), canonical)
+        self._build_failure_links()
+        self.size = len(aliases)
+
+    @classmethod
+    def from_destinations(cls, destinations: Iterable[str], aliases: Optional[Dict[str, str]] = None):
+        table = {name: name for name in destinations if name}
+        table.update(aliases or {})
+        return cls(table)
+
+    def _add(self, alias: str, canonical: str):
+        state = 0
+        for ch in alias:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append((len(alias), canonical))
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def find_spans(self, text: str) -> List[Tuple[int, int, str]]:
+        lowered = text.lower()
+        n = len(lowered)
+        goto, fail, out = self._goto, self._fail, self._out
+        candidates = []
+        state = 0
+        for i, ch in enumerate(lowered):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for length, canonical in out[state]:
+                start = i - length + 1
+                if (start == 0 or not lowered[start - 1].isalnum()) and (i + 1 == n or not lowered[i + 1].isalnum()):
+                    candidates.append((start, i + 1, canonical))
+        candidates.sort(key=lambda span: (span[0], span[0] - span[1]))
+        spans = []
+        end = -1
+        for span in candidates:
+            if span[0] >= end:
+                spans.append(span)
+                end = span[1]
+        return spans
+
+    def find(self, text: str) -> List[str]:
+        return [canonical for _, _, canonical in self.find_spans(text)]
+
+
+def load_destinations(csv_path: str = DEFAULT_INPUT, column: str = 'location') -> List[str]:
+    return sorted(pd.read_csv(csv_path, usecols=[column])[column].dropna().astype(str).unique())
+
+
+_worker_matcher: Optional[GazetteerMatcher] = None
+
+
+def _init_worker(matcher: GazetteerMatcher):
+    global _worker_matcher
+    _worker_matcher = matcher
+
+
+def _count_texts(texts: List[str]) -> Counter:
+    counts = Counter()
+    for text in texts:
+        counts.update(_worker_matcher.find(text))
+    return counts
+
+
+def count_locations(matcher: GazetteerMatcher, csv_path: str = DEFAULT_INPUT, text_column: str = 'post',
+                    chunksize: int = 50000, n_jobs: int = 1) -> Counter:
+    # Chunks are matched in worker processes; each returns a partial Counter that is summed here
+    counts = Counter()
+    chunks = (chunk[text_column].fillna('').astype(str).tolist()
+              for chunk in pd.read_csv(csv_path, usecols=[text_column], chunksize=chunksize))
+    if n_jobs == 1:
+        _init_worker(matcher)
+        for texts in chunks:
+            counts.update(_count_texts(texts))
+        return counts
+    with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker, initargs=(matcher,)) as pool:
+        for partial in pool.map(_count_texts, chunks):
+            counts.update(partial)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Count destination mentions with a compiled gazetteer")
+    parser.add_argument('--input', default=DEFAULT_INPUT)
+    parser.add_argument('--destinations', help="text file with one destination per line "
+                                               "(default: unique values of the location column)")
+    parser.add_argument('--text-column', default='post')
+    parser.add_argument('--chunksize', type=int, default=50000)
+    parser.add_argument('--n-jobs', type=int, default=1)
+    parser.add_argument('--top', type=int, default=10)
+    args = parser.parse_args()
+
+    if args.destinations:
+        with open(args.destinations, encoding='utf-8') as f:
+            destinations = [line.strip() for line in f if line.strip()]
+    else:
+        destinations = load_destinations(args.input)
+    matcher = GazetteerMatcher.from_destinations(destinations, DEFAULT_ALIASES)
+    logger.info(f"Gazetteer built with {matcher.size} aliases for {len(destinations)} destinations")
+
+    start = time.perf_counter()
+    counts = count_locations(matcher, args.input, args.text_column, args.chunksize, args.n_jobs)
+    logger.info(f"Matched {sum(counts.values())} mentions in {time.perf_counter() - start:.2f}s")
+    print(f"\nTop {args.top} destinations:")
+    for destination, count in counts.most_common(args.top):
+        print(f"{destination}: {count}")
+
+
+if __name__ == "__main__":
+    main()
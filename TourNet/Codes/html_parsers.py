@@ -0,0 +1,116 @@
+from typing import Iterable, List, Tuple
+
+from bs4 import BeautifulSoup
+
+try:
+    import lxml.html as lxml_html
+    from lxml import etree
+except ImportError:
+    lxml_html = None
+
+POST_SELECTORS = ['article', '.post', '.blog-post', '.entry']
+TITLE_TAGS = ('h1', 'h2', 'h3')
+MAX_POSTS = 5
+MAX_CONTENT_CHARS = 500
+# Strings inside these tags are not page text; BeautifulSoup's get_text() skips them as well
+NON_TEXT_TAGS = {'script', 'style', 'template'}
+
+
+def join_until(strings: Iterable[str], limit: int = MAX_CONTENT_CHARS) -> str:
+    # Same result as ''.join(stripped strings)[:limit], but stops pulling strings once `limit` is reached
+    parts = []
+    size = 0
+    for text in strings:
+        parts.append(text)
+        size += len(text)
+        if size >= limit:
+            break
+    return ''.join(parts)[:limit]
+
+
+class SoupBackend:
+    # Reference backend: BeautifulSoup with the given tree builder ('html.parser' matches the original scraper)
+    def __init__(self, features: str = 'html.parser'):
+        self.name = f"bs4/{features}"
+        self.features = features
+
+    def extract_posts(self, html: str) -> List[Tuple[str, str]]:
+        soup = BeautifulSoup(html, self.features)
+        for selector in POST_SELECTORS:
+            elements = soup.select(selector)
+            if elements:
+                posts = []
+                for elem in elements[:MAX_POSTS]:
+                    title = elem.find(list(TITLE_TAGS))
+                    title_text = title.get_text(strip=True) if title else "No title"
+                    posts.append((title_text, join_until(elem.stripped_strings)))
+                return posts
+        return []
+
+
+class LxmlBackend:
+    # libxml2-based backend; selectors are evaluated as plain element/class scans instead of CSS
+    name = 'lxml'
+
+    def __init__(self):
+        if lxml_html is None:
+            raise ImportError("lxml is required for the lxml parser backend")
+
+    @staticmethod
+    def _stripped_strings(elem) -> Iterable[str]:
+        stack = [(elem, False)]
+        while stack:
+            node, is_tail = stack.pop()
+            if is_tail:
+                text = node.tail
+            else:
+                if isinstance(node.tag, str) and node.tag not in NON_TEXT_TAGS:
+                    text = node.text
+                    for child in reversed(node):
+                        stack.append((child, True))
+                        stack.append((child, False))
+                else:
+                    text = None
+            if text:
+                text = text.strip()
+                if text:
+                    yield text
+
+    @staticmethod
+    def _select(root, selector: str) -> List:
+        if selector.startswith('.'):
+            class_name = selector[1:]
+            return [el for el in root.iter() if isinstance(el.tag, str)
+                    and class_name in (el.get('class') or '').split()]
+        return list(root.iter(selector))
+
+    def extract_posts(self, html: str) -> List[Tuple[str, str]]:
+        try:
+            root = lxml_html.document_fromstring(html)
+        except ValueError:
+            # Unicode input with an XML encoding declaration has to be handed to libxml2 as bytes
+            root = lxml_html.document_fromstring(html.encode('utf-8'))
+        except etree.ParserError:
+            return []
+        for selector in POST_SELECTORS:
+            elements = self._select(root, selector)
+            if elements:
+                posts = []
+                for elem in elements[:MAX_POSTS]:
+                    title = next((el for el in elem.iter(*TITLE_TAGS) if el is not elem), None)
+                    title_text = ''.join(self._stripped_strings(title)) if title is not None else "No title"
+                    posts.append((title_text, join_until(self._stripped_strings(elem))))
+                return posts
+        return []
+
+
+def get_parser_backend(name: str = 'auto'):
+    if name == 'auto':
+        return LxmlBackend() if lxml_html is not None else SoupBackend()
+    if name == 'lxml':
+        return LxmlBackend()
+    if name.startswith('bs4/'):
+        return SoupBackend(name.split('/', 1)[1])
+    if name == 'html.parser':
+        return SoupBackend()
+    raise ValueError(f"Unknown parser backend: {name}")
@@ -0,0 +1,180 @@
+import argparse
+import logging
+import time
+from typing import Dict, Iterable, Iterator, List
+
+import numpy as np
+import pandas as pd
+
+from record_pipeline import utc_timestamps
+from trending import SpaceSaving
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+DEFAULT_INPUT = "TourNet/Datasets/tournet_social_data.csv"
+# Engagement histogram: four bins per power of two (~19% wide), interpolated within the bin for percentiles
+BINS_PER_OCTAVE = 4
+HISTOGRAM_BINS = 32 * BINS_PER_OCTAVE
+NO_ENGAGEMENT = np.iinfo(np.int64).max
+
+
+def engagement_scale(engagement: np.ndarray) -> np.ndarray:
+    return BINS_PER_OCTAVE * np.log2(np.maximum(engagement.astype(np.float64), 0) + 1)
+
+
+def engagement_bins(engagement: np.ndarray) -> np.ndarray:
+    return np.minimum(engagement_scale(engagement).astype(np.int64), HISTOGRAM_BINS - 1)
+
+
+class InfluencerIndex:
+    # Per-username aggregates in growable NumPy columns (one row per user). Batches are folded in with
+    # vectorised scatter-adds. Scores use raw engagement, so earlier users never need re-scoring.
+    def __init__(self, capacity: int = 1024, hashtags_per_user: int = 10):
+        self.hashtags_per_user = hashtags_per_user
+        self.user_ids: Dict[str, int] = {}
+        self.usernames: List[str] = []
+        self.post_count = np.zeros(capacity, dtype=np.int64)
+        self.engagement_sum = np.zeros(capacity, dtype=np.int64)
+        self.engagement_min = np.full(capacity, NO_ENGAGEMENT, dtype=np.int64)
+        self.engagement_max = np.zeros(capacity, dtype=np.int64)
+        self.last_seen = np.full(capacity, -np.inf, dtype=np.float64)
+        self.histogram = np.zeros((capacity, HISTOGRAM_BINS), dtype=np.uint32)
+        self.hashtags: List[SpaceSaving] = []
+
+    def __len__(self) -> int:
+        return len(self.usernames)
+
+    def _grow(self, needed: int):
+        capacity = len(self.post_count)
+        if needed <= capacity:
+            return
+        new_capacity = max(needed, capacity * 2)
+        for name, fill in (('post_count', 0), ('engagement_sum', 0), ('engagement_min', NO_ENGAGEMENT),
+                           ('engagement_max', 0), ('last_seen', -np.inf)):
+            column = getattr(self, name)
+            grown = np.full(new_capacity, fill, dtype=column.dtype)
+            grown[:capacity] = column
+            setattr(self, name, grown)
+        histogram = np.zeros((new_capacity, HISTOGRAM_BINS), dtype=np.uint32)
+        histogram[:capacity] = self.histogram
+        self.histogram = histogram
+
+    def _ids(self, usernames: Iterable[str]) -> np.ndarray:
+        ids = []
+        for username in usernames:
+            user_id = self.user_ids.get(username)
+            if user_id is None:
+                user_id = len(self.usernames)
+                self.user_ids[username] = user_id
+                self.usernames.append(username)
+                self.hashtags.append(SpaceSaving(self.hashtags_per_user))
+            ids.append(user_id)
+        self._grow(len(self.usernames))
+        return np.asarray(ids, dtype=np.int64)
+
+    def update_frame(self, df: pd.DataFrame, time_column: str = 'timestamp'):
+        # Accepts collector output (list hashtags, ISO `timestamp`) or TourNet CSV rows (comma-joined hashtags,
+        # `date`)
+        if df.empty:
+            return
+        codes, uniques = pd.factorize(df['username'].astype(str))
+        ids = self._ids(uniques)[codes]
+        engagement = df['engagement'].fillna(0).to_numpy(dtype=np.int64)
+        if time_column not in df and 'date' in df:
+            time_column = 'date'
+        seen = utc_timestamps(df[time_column])
+        epochs = (seen - pd.Timestamp(0, tz='UTC')).dt.total_seconds().fillna(-np.inf).to_numpy(dtype=np.float64)
+
+        np.add.at(self.post_count, ids, 1)
+        np.add.at(self.engagement_sum, ids, engagement)
+        np.minimum.at(self.engagement_min, ids, engagement)
+        np.maximum.at(self.engagement_max, ids, engagement)
+        np.maximum.at(self.last_seen, ids, epochs)
+        np.add.at(self.histogram, (ids, engagement_bins(engagement)), 1)
+
+        for user_id, tags in zip(ids, df['hashtags']):
+            if isinstance(tags, str):
+                tags = [tag.strip() for tag in tags.split(',') if tag.strip()]
+            for tag in tags or []:
+                self.hashtags[user_id].add(tag.lower())
+
+    def observe(self, records: Iterable[Dict], batch_size: int = 1000) -> Iterator[Dict]:
+        # Pass-through tap for a record stream; records are indexed a batch at a time
+        batch = []
+        for record in records:
+            batch.append(record)
+            if len(batch) >= batch_size:
+                self.update_frame(pd.DataFrame(batch))
+                batch = []
+            yield record
+        if batch:
+            self.update_frame(pd.DataFrame(batch))
+
+    def percentile(self, user_id: int, q: float) -> float:
+        counts = self.histogram[user_id]
+        total = counts.sum()
+        if not total:
+            return 0.0
+        cumulative = np.cumsum(counts)
+        rank = q / 100 * total
+        bin_index = min(int(np.searchsorted(cumulative, rank)), HISTOGRAM_BINS - 1)
+        # Interpolate the rank within its bin on the log2(engagement + 1) scale, then clamp to the values seen
+        below = cumulative[bin_index] - counts[bin_index]
+        fraction = (rank - below) / counts[bin_index] if counts[bin_index] else 0.0
+        estimate = 2 ** ((bin_index + fraction) / BINS_PER_OCTAVE) - 1
+        return float(np.clip(estimate, self.engagement_min[user_id], self.engagement_max[user_id]))
+
+    def top(self, n: int = 10, by: str = 'engagement_sum', min_posts: int = 1) -> pd.DataFrame:
+        users = len(self.usernames)
+        if by == 'mean_engagement':
+            scores = self.engagement_sum[:users] / np.maximum(self.post_count[:users], 1)
+        else:
+            scores = getattr(self, by)[:users].astype(np.float64)
+        scores = np.where(self.post_count[:users] >= min_posts, scores, -np.inf)
+        n = min(n, users)
+        if not n:
+            return pd.DataFrame()
+        candidates = np.argpartition(-scores, n - 1)[:n]
+        ranked = candidates[np.argsort(-scores[candidates], kind='stable')]
+        return pd.DataFrame([{
+            'username': self.usernames[i],
+            'posts': int(self.post_count[i]),
+            'engagement_sum': int(self.engagement_sum[i]),
+            'mean_engagement': self.engagement_sum[i] / self.post_count[i],
+            'p50_engagement': self.percentile(i, 50),
+            'p90_engagement': self.percentile(i, 90),
+            'max_engagement': int(self.engagement_max[i]),
+            'top_hashtags': [tag for tag, _ in sorted(self.hashtags[i].counts.items(), key=lambda kv: -kv[1])[:3]],
+            'last_seen': pd.Timestamp(self.last_seen[i], unit='s', tz='UTC') if np.isfinite(self.last_seen[i])
+            else pd.NaT,
+        } for i in ranked if np.isfinite(scores[i])])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build an influencer index and list the top users")
+    parser.add_argument('--input', default=DEFAULT_INPUT)
+    parser.add_argument('--chunksize', type=int, default=50000)
+    parser.add_argument('--top', type=int, default=10)
+    parser.add_argument('--by', default='engagement_sum', choices=['engagement_sum', 'mean_engagement', 'post_count',
+                                                                   'engagement_max'])
+    parser.add_argument('--min-posts', type=int, default=1)
+    args = parser.parse_args()
+
+    index = InfluencerIndex()
+    start = time.perf_counter()
+    rows = 0
+    for chunk in pd.read_csv(args.input, chunksize=args.chunksize):
+        index.update_frame(chunk)
+        rows += len(chunk)
+    logger.info(f"Indexed {rows} posts from {len(index)} users in {time.perf_counter() - start:.2f}s")
+
+    start = time.perf_counter()
+    top = index.top(args.top, args.by, args.min_posts)
+    logger.info(f"Top-{args.top} query took {(time.perf_counter() - start) * 1000:.2f} ms")
+    with pd.option_context('display.width', 200, 'display.max_columns', None):
+        print(top.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+import bisect
+import cProfile
+import io
+import json
+import logging
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Seconds; covers sub-millisecond parse steps up to slow blog downloads
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+BYTES_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self) -> Iterator[Tuple[str, int]]:
+        running = 0
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            running += count
+            yield ('+Inf' if bound == float('inf') else repr(bound)), running
+
+
+def _labels(labels: Dict[str, str]) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _escape(value: str) -> str:
+    # Label values in the exposition format escape backslash, double quote and line feed
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels: Labels, extra: Tuple[str, str] = None) -> str:
+    pairs = labels + ((extra,) if extra else ())
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in pairs) + '}'
+
+
+class MetricsRegistry:
+    # Thread-safe counters, gauges and histograms keyed by metric name plus labels (stage, host, ...). Worker
+    # threads record into one registry; export happens once at the end of a run.
+    def __init__(self, prefix: str = 'tournet_'):
+        self.prefix = prefix
+        self.counters: Dict[str, Dict[Labels, float]] = {}
+        self.gauges: Dict[str, Dict[Labels, float]] = {}
+        self.histograms: Dict[str, Dict[Labels, Histogram]] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, name: str, value: float = 1, **labels):
+        with self._lock:
+            series = self.counters.setdefault(name, {})
+            key = _labels(labels)
+            series[key] = series.get(key, 0) + value
+
+    def set(self, name: str, value: float, **labels):
+        with self._lock:
+            self.gauges.setdefault(name, {})[_labels(labels)] = value
+
+    def observe(self, name: str, value: float, buckets: Tuple[float, ...] = LATENCY_BUCKETS, **labels):
+        with self._lock:
+            series = self.histograms.setdefault(name, {})
+            key = _labels(labels)
+            if key not in series:
+                series[key] = Histogram(buckets)
+            series[key].observe(value)
+
+    @contextmanager
+    def timer(self, name: str, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def count(self, records: Iterable, stage: str) -> Iterator:
+        # Pass-through tap counting the records that reach a pipeline stage
+        for record in records:
+            self.inc('records_total', stage=stage)
+            yield record
+
+    def to_dict(self) -> Dict:
+        def series(metrics, render):
+            return {name: [{'labels': dict(labels), **render(value)} for labels, value in values.items()]
+                    for name, values in metrics.items()}
+
+        with self._lock:
+            return {
+                'counters': series(self.counters, lambda value: {'value': value}),
+                'gauges': series(self.gauges, lambda value: {'value': value}),
+                'histograms': series(self.histograms, lambda h: {
+                    'count': h.count, 'sum': h.sum, 'buckets': dict(h.cumulative())}),
+            }
+
+    def to_prometheus(self) -> str:
+        lines = []
+        with self._lock:
+            for kind, metrics in (('counter', self.counters), ('gauge', self.gauges)):
+                for name, values in sorted(metrics.items()):
+                    lines.append(f"# TYPE {self.prefix}{name} {kind}")
+                    for labels, value in values.items():
+                        lines.append(f"{self.prefix}{name}{_format_labels(labels)} {value}")
+            for name, values in sorted(self.histograms.items()):
+                lines.append(f"# TYPE {self.prefix}{name} histogram")
+                for labels, histogram in values.items():
+                    for bound, count in histogram.cumulative():
+                        lines.append(f"{self.prefix}{name}_bucket{_format_labels(labels, ('le', bound))} {count}")
+                    lines.append(f"{self.prefix}{name}_sum{_format_labels(labels)} {histogram.sum}")
+                    lines.append(f"{self.prefix}{name}_count{_format_labels(labels)} {histogram.count}")
+        return '\n'.join(lines) + '\n'
+
+    def write(self, path: str):
+        # .json writes the JSON form; anything else is the Prometheus text format (e.g. for node_exporter's
+        # textfile collector, which expects .prom)
+        with open(path, 'w', encoding='utf-8') as f:
+            if path.endswith('.json'):
+                json.dump(self.to_dict(), f, indent=2)
+            else:
+                f.write(self.to_prometheus())
+        logger.info(f"Metrics written to {path}")
+
+
+class StackSampler:
+    # Wall-clock sampling profiler over all threads. cProfile only sees the calling thread, so it misses the
+    # blog and Twitter worker pools; this samples every thread and writes folded stacks for flame graphs.
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.samples = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _run(self):
+        own = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.interval):
+            names.update((thread.ident, thread.name) for thread in threading.enumerate())
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(f"{frame.f_code.co_name} ({frame.f_code.co_filename}:{frame.f_code.co_firstlineno})")
+                    frame = frame.f_back
+                thread = names.get(ident, str(ident)).rsplit('_', 1)[0]
+                self.samples[';'.join([thread] + stack[::-1])] += 1
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        return False
+
+    def write(self, path: str):
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+@contextmanager
+def profiled(profiler: str = None, output: str = 'profile', top: int = 25):
+    # profiler: None (off), 'cprofile' (writes <output>.prof for pstats/snakeviz) or 'sampling' (writes
+    # <output>.folded for flamegraph.pl/speedscope)
+    if profiler is None:
+        yield
+        return
+    if profiler == 'cprofile':
+        profile = cProfile.Profile()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            profile.dump_stats(f"{output}.prof")
+            summary = io.StringIO()
+            pstats.Stats(profile, stream=summary).sort_stats('cumulative').print_stats(top)
+            logger.info(f"cProfile written to {output}.prof\n{summary.getvalue()}")
+    elif profiler == 'sampling':
+        sampler = StackSampler()
+        try:
+            with sampler:
+                yield
+        finally:
+            sampler.write(f"{output}.folded")
+            logger.info(f"{sum(sampler.samples.values())} stack samples written to {output}.folded")
+    else:
+        raise ValueError(f"Unknown profiler '{profiler}', expected 'cprofile' or 'sampling'")
@@ -0,0 +1,192 @@
+import argparse
+import logging
+import re
+import zlib
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+MAX_HASH = np.uint64((1 << 32) - 1)
+TOKEN_RE = re.compile(r'\w+')
+
+
+def shingle_hashes(text: str, k: int = 5) -> np.ndarray:
+    # Character k-grams over the lower-cased word stream, so punctuation, emoji and spacing edits do not count
+    normalized = ' '.join(TOKEN_RE.findall(text.lower()))
+    if not normalized:
+        return np.empty(0, dtype=np.uint64)
+    if len(normalized) <= k:
+        grams = {normalized}
+    else:
+        grams = {normalized[i:i + k] for i in range(len(normalized) - k + 1)}
+    return np.fromiter((zlib.crc32(gram.encode('utf-8')) for gram in grams), dtype=np.uint64, count=len(grams))
+
+
+def choose_bands(num_perm: int, threshold: float) -> Tuple[int, int]:
+    # Pick bands x rows whose LSH S-curve midpoint (1/b)^(1/r) is the highest one not above the threshold.
+    # Erring low favours recall; candidates are verified against the threshold anyway.
+    best = (num_perm, 1)
+    best_midpoint = 0.0
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        midpoint = (1 / bands) ** (1 / rows)
+        if best_midpoint < midpoint <= threshold:
+            best, best_midpoint = (bands, rows), midpoint
+    return best
+
+
+class NearDuplicateFilter:
+    # Streaming MinHash + LSH banding. Signatures of kept posts live in a fixed-size ring buffer
+    # (capacity x num_perm uint32), so memory is bounded by `capacity` however long the stream is.
+    # Each band has an array-backed table holding `bucket_size` ring slots per hash bucket, filled round-robin. A
+    # slot is a candidate only while it still holds a post with the same band key, so evicted posts drop out.
+    # Candidates are confirmed by comparing signatures against `threshold`. Like a repost across accounts, a near
+    # copy by another user counts as a duplicate: unlike exact dedup, `username` is not part of the key.
+    def __init__(self, threshold: float = 0.8, num_perm: int = 128, k: int = 5, capacity: int = 100_000,
+                 seed: int = 1, bucket_size: int = 4):
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.k = k
+        self.capacity = capacity
+        self.bucket_size = bucket_size
+        self.bands, self.rows = choose_bands(num_perm, threshold)
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, int(MERSENNE_PRIME), size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, int(MERSENNE_PRIME), size=num_perm, dtype=np.uint64)
+        self._mix = rng.randint(1, np.iinfo(np.int64).max, size=(self.bands, self.rows), dtype=np.int64
+                                ).astype(np.uint64) | np.uint64(1)
+        initial = min(capacity, 1024)
+        self._signatures = np.zeros((initial, num_perm), dtype=np.uint32)
+        self._slot_keys = np.zeros((initial, self.bands), dtype=np.uint64)
+        self._table_size = 1 << max(capacity - 1, 1).bit_length()
+        self._tables = np.full((self.bands, self._table_size, bucket_size), -1, dtype=np.int32)
+        self._fill = np.zeros((self.bands, self._table_size), dtype=np.uint8)
+        self._band_index = np.arange(self.bands)
+        self._count = 0
+        self.stats = {'seen': 0, 'duplicates': 0, 'no_shingles': 0}
+
+    def signature(self, text: str) -> np.ndarray:
+        return self._minhash(shingle_hashes(text, self.k))
+
+    def _minhash(self, hashes: np.ndarray) -> np.ndarray:
+        if not len(hashes):
+            return np.full(self.num_perm, MAX_HASH, dtype=np.uint32)
+        # uint64 overflow in a * h wraps around; the result is still a valid universal-style hash
+        with np.errstate(over='ignore'):
+            permuted = (np.outer(hashes, self._a) + self._b) % MERSENNE_PRIME & MAX_HASH
+        return permuted.min(axis=0).astype(np.uint32)
+
+    def _band_keys(self, signature: np.ndarray) -> np.ndarray:
+        # One 64-bit multiply-add hash per band of `rows` signature values
+        with np.errstate(over='ignore'):
+            return (signature.reshape(self.bands, self.rows).astype(np.uint64) * self._mix).sum(axis=1)
+
+    def _slot(self, doc_id: int) -> int:
+        return doc_id % self.capacity
+
+    def _candidates(self, keys: np.ndarray) -> np.ndarray:
+        # Ring slots sharing at least one band key with `keys`
+        slots = self._tables[self._band_index, keys % self._table_size]
+        bands = np.broadcast_to(self._band_index[:, None], slots.shape)
+        live = slots >= 0
+        slots, bands = slots[live], bands[live]
+        return np.unique(slots[self._slot_keys[slots, bands] == keys[bands]])
+
+    def _store(self, signature: np.ndarray, keys: np.ndarray):
+        slot = self._slot(self._count)
+        if slot >= len(self._signatures):
+            size = min(self.capacity, len(self._signatures) * 2)
+            for name in ('_signatures', '_slot_keys'):
+                array = getattr(self, name)
+                grown = np.zeros((size, array.shape[1]), dtype=array.dtype)
+                grown[:len(array)] = array
+                setattr(self, name, grown)
+        self._signatures[slot] = signature
+        self._slot_keys[slot] = keys
+        buckets = keys % self._table_size
+        fill = self._fill[self._band_index, buckets]
+        self._tables[self._band_index, buckets, fill % self.bucket_size] = slot
+        self._fill[self._band_index, buckets] = fill + 1
+        self._count += 1
+
+    def similarity(self, a: np.ndarray, b: np.ndarray) -> float:
+        return float(np.count_nonzero(a == b)) / self.num_perm
+
+    def is_duplicate(self, text: str) -> bool:
+        # Returns True for near-duplicates of something already kept; otherwise remembers the text
+        self.stats['seen'] += 1
+        hashes = shingle_hashes(text, self.k)
+        if not len(hashes):
+            # Empty or emoji-only text has nothing to compare; all such posts would share one signature
+            self.stats['no_shingles'] += 1
+            return False
+        signature = self._minhash(hashes)
+        keys = self._band_keys(signature)
+        for slot in self._candidates(keys):
+            if self.similarity(signature, self._signatures[slot]) >= self.threshold:
+                self.stats['duplicates'] += 1
+                return True
+        self._store(signature, keys)
+        return False
+
+    def filter(self, records: Iterable[Dict], text_key: str = 'post_text') -> Iterator[Dict]:
+        for record in records:
+            if not self.is_duplicate(record[text_key]):
+                yield record
+
+
+def dedup_file(input_path: str, output_path: str, text_column: str, dedup: NearDuplicateFilter,
+               chunksize: int = 50000) -> Tuple[int, int]:
+    # Standalone pass over saved collector output (CSV or JSON Lines), writing kept rows chunk by chunk
+    if Path(input_path).suffix == '.jsonl':
+        chunks = pd.read_json(input_path, lines=True, chunksize=chunksize)
+    else:
+        chunks = pd.read_csv(input_path, chunksize=chunksize)
+    total = kept = 0
+    header = True
+    for chunk in chunks:
+        mask = [not dedup.is_duplicate(str(text)) for text in chunk[text_column].fillna('')]
+        kept_rows = chunk[mask]
+        if Path(output_path).suffix == '.jsonl':
+            # Each chunk ends with a newline so the next one starts on its own line; empty chunks add nothing
+            text = kept_rows.to_json(orient='records', lines=True, force_ascii=False) if len(kept_rows) else ''
+            with open(output_path, 'w' if header else 'a', encoding='utf-8') as f:
+                f.write(text if not text or text.endswith('\n') else text + '\n')
+        else:
+            kept_rows.to_csv(output_path, mode='w' if header else 'a', header=header, index=False)
+        header = False
+        total += len(chunk)
+        kept += len(kept_rows)
+        logger.info(f"Processed {total} rows, kept {kept}")
+    return total, kept
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Remove near-duplicate posts with MinHash/LSH, across all users")
+    parser.add_argument('input', help="collector output (.csv or .jsonl)")
+    parser.add_argument('output', help="deduplicated output (.csv or .jsonl)")
+    parser.add_argument('--text-column', default='post_text')
+    parser.add_argument('--threshold', type=float, default=0.8, help="estimated Jaccard similarity to drop at")
+    parser.add_argument('--num-perm', type=int, default=128)
+    parser.add_argument('--shingle', type=int, default=5)
+    parser.add_argument('--capacity', type=int, default=100_000,
+                        help="signatures kept for comparison (about 1 KB each, tables included)")
+    parser.add_argument('--chunksize', type=int, default=50000)
+    args = parser.parse_args()
+
+    dedup = NearDuplicateFilter(args.threshold, args.num_perm, args.shingle, args.capacity)
+    logger.info(f"LSH with {dedup.bands} bands x {dedup.rows} rows")
+    total, kept = dedup_file(args.input, args.output, args.text_column, dedup, args.chunksize)
+    logger.info(f"Removed {total - kept} near-duplicates out of {total} rows; saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,111 @@
-# Sample code snippet
-import spacy
+import argparse
+import json
+import logging
+import time
 from collections import Counter
+from typing import Iterable, Iterator, List, Tuple
+
+import pandas as pd
+import spacy
+
+from ner_cache import EntityCache, extract_entities_cached
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+DEFAULT_INPUT = "TourNet/Datasets/tournet_social_data.csv"
+LOCATION_LABELS = ('GPE', 'LOC')
+# Components the statistical NER depends on; everything else is switched off before inference
+NER_COMPONENTS = {'tok2vec', 'transformer', 'ner'}
+
+
+def load_nlp(model: str = 'en_core_web_sm'):
+    nlp = spacy.load(model)
+    disabled = [name for name in nlp.pipe_names if name not in NER_COMPONENTS]
+    nlp.select_pipes(disable=disabled)
+    logger.info(f"Loaded {model} with components {nlp.pipe_names} (disabled {disabled})")
+    return nlp
+
+
+def iter_post_chunks(csv_path: str, chunksize: int = 10000, text_column: str = 'post') -> Iterator[pd.DataFrame]:
+    for chunk in pd.read_csv(csv_path, chunksize=chunksize):
+        chunk[text_column] = chunk[text_column].fillna('').astype(str)
+        yield chunk
+
+
+def extract_entities(nlp, texts: Iterable[str], batch_size: int = 256,
+                     n_process: int = 1) -> Iterator[List[Tuple[str, str]]]:
+    for doc in nlp.pipe(texts, batch_size=batch_size, n_process=n_process):
+        yield [(ent.text, ent.label_) for ent in doc.ents]
+
+
+def run_ner(nlp, csv_path: str = DEFAULT_INPUT, output_path: str = None, chunksize: int = 10000,
+            batch_size: int = 256, n_process: int = 1, text_column: str = 'post',
+            cache: EntityCache = None) -> Counter:
+    location_counts = Counter()
+    processed = 0
+    start = time.perf_counter()
+    output = open(output_path, 'w', encoding='utf-8') if output_path else None
+    try:
+        for chunk in iter_post_chunks(csv_path, chunksize, text_column):
+            if cache:
+                entities = extract_entities_cached(nlp, chunk[text_column], cache, batch_size, n_process)
+            else:
+                entities = extract_entities(nlp, chunk[text_column], batch_size, n_process)
+            for row, ents in zip(chunk.index, entities):
+                locations = [text for text, label in ents if label in LOCATION_LABELS]
+                location_counts.update(locations)
+                if output:
+                    output.write(json.dumps({'row': int(row), 'entities': ents, 'locations': locations},
+                                            ensure_ascii=False))
+                    output.write('\n')
+            processed += len(chunk)
+            elapsed = time.perf_counter() - start
+            logger.info(f"Processed {processed} posts ({processed / elapsed:.1f} posts/sec)")
+    finally:
+        if output:
+            output.close()
+    elapsed = time.perf_counter() - start
+    if processed:
+        logger.info(f"NER finished: {processed} posts in {elapsed:.2f}s ({processed / elapsed:.1f} posts/sec)")
+    if cache:
+        logger.info(f"NER {cache.report()}")
+    return location_counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract destination entities from TourNet posts with spaCy")
+    parser.add_argument('--input', default=DEFAULT_INPUT)
+    parser.add_argument('--output', help="JSON Lines file for per-post entities")
+    parser.add_argument('--counts-output', help="CSV file for aggregate destination counts")
+    parser.add_argument('--model', default='en_core_web_sm')
+    parser.add_argument('--chunksize', type=int, default=10000)
+    parser.add_argument('--batch-size', type=int, default=256)
+    parser.add_argument('--n-process', type=int, default=1)
+    parser.add_argument('--text-column', default='post')
+    parser.add_argument('--top', type=int, default=10)
+    parser.add_argument('--cache', help="SQLite file for the persistent entity cache")
+    parser.add_argument('--cache-size', type=int, default=100000, help="in-memory LRU entries")
+    parser.add_argument('--no-cache', action='store_true', help="run the model on every post")
+    args = parser.parse_args()
 
-nlp = spacy.load("TourNet/Datasets/tournet_social_data.csv")
-location_entities = []
+    nlp = load_nlp(args.model)
+    cache = None if args.no_cache else EntityCache(args.cache, args.cache_size, model_name=args.model)
+    try:
+        location_counts = run_ner(nlp, args.input, args.output, args.chunksize, args.batch_size, args.n_process,
+                                  args.text_column, cache)
+    finally:
+        if cache:
+            cache.close()
+    if args.counts_output:
+        pd.DataFrame(location_counts.most_common(), columns=['destination', 'mentions']).to_csv(
+            args.counts_output, index=False
+        )
+        logger.info(f"Destination counts saved to {args.counts_output}")
+    print(f"\nTop {args.top} destinations:")
+    for destination, count in location_counts.most_common(args.top):
+        print(f"{destination}: {count}")
 
-for text in df['post']:
-    doc = nlp(text)
-    location_entities += [ent.text for ent in doc.ents if ent.label_ in ['GPE', 'LOC']]
 
-location_counts = Counter(location_entities).most_common(10)
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+import hashlib
+import json
+import re
+import sqlite3
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+Entities = List[Tuple[str, str]]
+
+WHITESPACE_RE = re.compile(r'\s+')
+
+
+def normalize_text(text: str) -> str:
+    # Case is kept: the statistical model is case-sensitive, so "paris" and "Paris" may tag differently
+    return WHITESPACE_RE.sub(' ', unicodedata.normalize('NFKC', text)).strip()
+
+
+class EntityCache:
+    # Content-addressed NER results: an in-memory LRU in front of an optional SQLite store.
+    # Keys include the model name so results from different models never mix.
+    def __init__(self, path: Optional[str] = None, max_entries: int = 100000, model_name: str = ''):
+        self.max_entries = max_entries
+        self.model_name = model_name
+        self._memory: 'OrderedDict[str, Entities]' = OrderedDict()
+        self._conn = None
+        if path:
+            self._conn = sqlite3.connect(path)
+            self._conn.execute('CREATE TABLE IF NOT EXISTS entities (key TEXT PRIMARY KEY, entities TEXT)')
+        self.stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'duplicates': 0}
+
+    def key(self, normalized_text: str) -> str:
+        return hashlib.blake2b(f"{self.model_name}\x00{normalized_text}".encode('utf-8'), digest_size=16).hexdigest()
+
+    def _remember(self, key: str, entities: Entities):
+        self._memory[key] = entities
+        self._memory.move_to_end(key)
+        if len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Entities]:
+        found = {}
+        pending = []
+        for key in keys:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                found[key] = self._memory[key]
+                self.stats['memory_hits'] += 1
+            else:
+                pending.append(key)
+        if self._conn and pending:
+            for i in range(0, len(pending), 500):
+                batch = pending[i:i + 500]
+                rows = self._conn.execute(
+                    f"SELECT key, entities FROM entities WHERE key IN ({','.join('?' * len(batch))})", batch
+                )
+                for key, entities in rows:
+                    entities = [tuple(ent) for ent in json.loads(entities)]
+                    found[key] = entities
+                    self._remember(key, entities)
+                    self.stats['disk_hits'] += 1
+        self.stats['misses'] += sum(1 for key in pending if key not in found)
+        return found
+
+    def put_many(self, results: Dict[str, Entities]):
+        for key, entities in results.items():
+            self._remember(key, entities)
+        if self._conn and results:
+            with self._conn:
+                self._conn.executemany(
+                    'INSERT OR REPLACE INTO entities VALUES (?, ?)',
+                    ((key, json.dumps(entities, ensure_ascii=False)) for key, entities in results.items())
+                )
+
+    def hit_rate(self) -> float:
+        lookups = self.stats['memory_hits'] + self.stats['disk_hits'] + self.stats['misses']
+        return (self.stats['memory_hits'] + self.stats['disk_hits']) / lookups if lookups else 0.0
+
+    def report(self) -> str:
+        return (f"cache hit rate {self.hit_rate():.1%} (memory {self.stats['memory_hits']}, "
+                f"disk {self.stats['disk_hits']}, misses {self.stats['misses']}, "
+                f"in-batch duplicates {self.stats['duplicates']})")
+
+    def close(self):
+        if self._conn:
+            self._conn.close()
+
+
+def extract_entities_cached(nlp, texts: Iterable[str], cache: EntityCache, batch_size: int = 256,
+                            n_process: int = 1) -> Iterator[Entities]:
+    # Texts are deduplicated by normalized hash before lookup, and only unique misses reach the model.
+    # Call once per chunk: the chunk's keys are held in memory while it is processed.
+    texts = list(texts)
+    normalized = [normalize_text(text) for text in texts]
+    keys = [cache.key(text) for text in normalized]
+
+    unique: Dict[str, str] = {}
+    for key, text in zip(keys, normalized):
+        if key not in unique:
+            unique[key] = text
+    cache.stats['duplicates'] += len(keys) - len(unique)
+
+    results = cache.get_many(list(unique))
+    misses = [key for key in unique if key not in results]
+    if misses:
+        docs = nlp.pipe((unique[key] for key in misses), batch_size=batch_size, n_process=n_process)
+        fresh = {key: [(ent.text, ent.label_) for ent in doc.ents] for key, doc in zip(misses, docs)}
+        cache.put_many(fresh)
+        results.update(fresh)
+
+    for key in keys:
+        yield results[key]
@@ -0,0 +1,109 @@
+import functools
+import logging
+import random
+import threading
+import time
+from typing import Callable, Optional, Tuple, Type
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    # Thread-safe token bucket; `clock`/`sleep` are injectable so the scheduler can be driven by a fake clock
+    def __init__(self, rate: float, capacity: float, clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.clock = clock
+        self.sleep = sleep
+        self._updated = clock()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        if now > self._updated:
+            self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+            self._updated = now
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = self.clock()
+                self._refill(now)
+                if now < self._paused_until:
+                    wait = self._paused_until - now
+                elif self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return waited
+                else:
+                    wait = (tokens - self.tokens) / self.rate
+            self.sleep(wait)
+            waited += wait
+
+    def pause_until(self, reset_epoch: float):
+        # The API reports resets as wall-clock epochs; translate to the bucket's clock and drain it
+        with self._lock:
+            now = self.clock()
+            self._paused_until = max(self._paused_until, now + max(0.0, reset_epoch - time.time()))
+            self.tokens = 0.0
+            self._updated = max(now, self._paused_until)
+
+
+def reset_time_from(exc: Exception) -> Optional[float]:
+    reset = getattr(exc, 'reset_time', None)
+    if reset is None:
+        headers = getattr(getattr(exc, 'response', None), 'headers', None) or {}
+        reset = headers.get('x-rate-limit-reset')
+    try:
+        return float(reset) if reset is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+class RateLimitScheduler:
+    # Shares one request budget between worker threads. Defaults match the v2 recent search app limit
+    # (450 requests / 15 min).
+    def __init__(self, requests_per_window: int = 450, window_seconds: float = 900.0, max_retries: int = 5,
+                 base_backoff: float = 1.0, max_backoff: float = 300.0,
+                 retry_on: Tuple[Type[BaseException], ...] = (Exception,),
+                 clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep):
+        self.bucket = TokenBucket(requests_per_window / window_seconds, requests_per_window, clock, sleep)
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.retry_on = retry_on
+        self.sleep = sleep
+        self.stats = {'requests': 0, 'retries': 0, 'wait_seconds': 0.0, 'backoff_seconds': 0.0}
+        self._stats_lock = threading.Lock()
+
+    def _record(self, key: str, value: float = 1):
+        with self._stats_lock:
+            self.stats[key] += value
+
+    def call(self, func: Callable, *args, **kwargs):
+        for attempt in range(self.max_retries + 1):
+            self._record('wait_seconds', self.bucket.acquire())
+            self._record('requests')
+            try:
+                return func(*args, **kwargs)
+            except self.retry_on as e:
+                if attempt == self.max_retries:
+                    raise
+                reset = reset_time_from(e)
+                if reset is not None:
+                    self.bucket.pause_until(reset)
+                backoff = min(self.max_backoff, self.base_backoff * 2 ** attempt) * random.uniform(0.5, 1.0)
+                logger.warning(f"{type(e).__name__} on attempt {attempt + 1}/{self.max_retries + 1}; "
+                               f"retrying in {backoff:.1f}s" + (" after rate-limit reset" if reset else ""))
+                self._record('retries')
+                self._record('backoff_seconds', backoff)
+                self.sleep(backoff)
+
+    def wrap(self, func: Callable) -> Callable:
+        # functools.wraps keeps __name__, which tweepy.Paginator uses to pick the pagination parameter
+        @functools.wraps(func)
+        def limited(*args, **kwargs):
+            return self.call(func, *args, **kwargs)
+        return limited
@@ -0,0 +1,150 @@
+import hashlib
+import json
+import logging
+import os
+from collections import OrderedDict
+from datetime import datetime, timezone
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List
+
+import pandas as pd
+
+from summary_stats import SummaryAggregator
+
+logger = logging.getLogger(__name__)
+
+CSV_COLUMNS = ['platform', 'post_text', 'username', 'timestamp', 'hashtags', 'location', 'likes', 'retweets',
+               'replies', 'engagement', 'url', 'search_hashtag', 'post_length', 'hashtag_count', 'engagement_rate',
+               'sentiment_score', 'sentiment']
+# Unique-post digests kept for exact dedup (~65 MB at the cap). This is a window, not a full history: a post
+# repeated after this many newer unique posts is no longer recognised and comes through again.
+DEDUP_MAX_KEYS = 500_000
+
+
+def as_utc(timestamp: datetime) -> datetime:
+    # Naive datetimes are host-local wall-clock time (what datetime.now() returns); astimezone() applies the
+    # host's offset, DST included, instead of mislabelling them as UTC
+    return timestamp.astimezone(timezone.utc)
+
+
+def parse_utc(value: str) -> datetime:
+    # One ISO-8601 value, by the same rules as utc_timestamps
+    timestamp = datetime.fromisoformat(value)
+    if timestamp.tzinfo is None and not any(sep in value for sep in 'T '):
+        return timestamp.replace(tzinfo=timezone.utc)
+    return as_utc(timestamp)
+
+
+def utc_timestamps(values: pd.Series) -> pd.Series:
+    # ISO-8601 values to tz-aware UTC. Values carrying an offset keep it; naive ones go through as_utc. Date-only
+    # values (the bundled CSV's 'date') have no time of day to shift and are kept as UTC midnight.
+    text = values.astype('string')
+    naive = ~text.str.contains(r'(?:Z|[+-]\d{2}:?\d{2})$', regex=True, na=True) & text.str.contains('[T ]', na=False)
+    parsed = pd.to_datetime(text.where(~naive), utc=True, format='ISO8601', errors='coerce')
+    if naive.any():
+        local = []
+        for value in text[naive]:
+            try:
+                local.append(parse_utc(value))
+            except ValueError:
+                local.append(pd.NaT)
+        parsed[naive.to_numpy()] = pd.to_datetime(local, utc=True)
+    return parsed
+
+
+def chunked(records: Iterable[Dict], size: int) -> Iterator[List[Dict]]:
+    iterator = iter(records)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def normalize_records(records: Iterable[Dict], max_keys: int = DEDUP_MAX_KEYS) -> Iterator[Dict]:
+    # Streaming equivalent of drop_duplicates(subset=['post_text', 'username']) plus the per-row derived
+    # columns, exact only within a window. Digests of recent unique posts live in an LRU capped at `max_keys`,
+    # so memory has a fixed ceiling (~130 bytes per key). A duplicate whose first copy has been evicted (more
+    # than `max_keys` newer unique posts in between) is NOT dropped; raise `max_keys` above the expected number
+    # of unique posts per run when exact dedup matters.
+    seen = OrderedDict()
+    for record in records:
+        key = hashlib.blake2b(f"{record['post_text']}\x00{record['username']}".encode('utf-8'),
+                              digest_size=16).digest()
+        if key in seen:
+            seen.move_to_end(key)
+            continue
+        seen[key] = None
+        if len(seen) > max_keys:
+            seen.popitem(last=False)
+        record['post_length'] = len(record['post_text'])
+        record['hashtag_count'] = len(record['hashtags'])
+        yield record
+
+
+class ChunkedRecordWriter:
+    # Writes records to a JSON Lines staging file as they arrive. engagement_rate depends on the corpus-wide
+    # maximum, so finalize() makes one streaming pass that fills it in and emits the final JSONL and CSV.
+    # Use it as a context manager: leaving the block without finalize() (e.g. on an error) drops the staging file.
+    def __init__(self, filename: str, chunk_size: int = 1000):
+        self.filename = filename
+        self.chunk_size = chunk_size
+        self.staging_path = f"{filename}.jsonl.part"
+        self.max_engagement = 0
+        self.summary = SummaryAggregator()
+        self._staging = open(self.staging_path, 'w', encoding='utf-8')
+
+    def write_chunk(self, chunk: List[Dict]):
+        for record in chunk:
+            self._staging.write(json.dumps(record, ensure_ascii=False, default=str))
+            self._staging.write('\n')
+            self.max_engagement = max(self.max_engagement, record['engagement'])
+            self.summary.update(record)
+        self._staging.flush()
+
+    def write(self, records: Iterable[Dict]):
+        for chunk in chunked(records, self.chunk_size):
+            self.write_chunk(chunk)
+
+    def close(self):
+        self._staging.close()
+        if os.path.exists(self.staging_path):
+            os.remove(self.staging_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
+
+    def _iter_staged(self) -> Iterator[Dict]:
+        with open(self.staging_path, encoding='utf-8') as f:
+            for line in f:
+                yield json.loads(line)
+
+    def finalize(self) -> int:
+        self._staging.close()
+        if not self.summary.total:
+            os.remove(self.staging_path)
+            logger.warning("No data to save")
+            return 0
+
+        denominator = self.max_engagement + 1
+        header = True
+        with open(f"{self.filename}.jsonl", 'w', encoding='utf-8') as jsonl:
+            for chunk in chunked(self._iter_staged(), self.chunk_size):
+                for record in chunk:
+                    record['engagement_rate'] = record['engagement'] / denominator
+                    jsonl.write(json.dumps(record, ensure_ascii=False))
+                    jsonl.write('\n')
+                pd.DataFrame(chunk, columns=CSV_COLUMNS).to_csv(
+                    f"{self.filename}.csv", mode='w' if header else 'a', header=header, index=False
+                )
+                header = False
+        os.remove(self.staging_path)
+        logger.info(f"Data saved to {self.filename}.jsonl and {self.filename}.csv")
+
+        self.summary.write(f"{self.filename}_summary.txt")
+        logger.info(f"Summary saved to {self.filename}_summary.txt")
+        return self.summary.total
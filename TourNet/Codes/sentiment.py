@@ -0,0 +1,114 @@
+import math
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Sequence
+
+import numpy as np
+
+# Compact travel-domain lexicon; weights are on a -3..3 scale
+LEXICON = {
+    'amazing': 3, 'awesome': 3, 'beautiful': 2.5, 'beauty': 2, 'best': 2.5, 'breathtaking': 3, 'bliss': 2.5,
+    'calm': 1.5, 'charming': 2, 'cozy': 1.5, 'delicious': 2.5, 'dream': 2, 'enjoy': 2, 'enjoyed': 2,
+    'epic': 2.5, 'excited': 2.5, 'fantastic': 3, 'favorite': 2, 'favourite': 2, 'friendly': 2, 'fun': 2,
+    'gorgeous': 3, 'great': 2.5, 'happy': 2.5, 'incredible': 3, 'love': 3, 'loved': 3, 'lovely': 2.5,
+    'magical': 3, 'memorable': 2, 'nice': 1.5, 'paradise': 3, 'peaceful': 2, 'perfect': 3, 'recommend': 2,
+    'relaxing': 2, 'stunning': 3, 'unforgettable': 3, 'wonderful': 3, 'worth': 1.5, 'wow': 2.5,
+    'awful': -3, 'bad': -2.5, 'boring': -2, 'cancelled': -2, 'canceled': -2, 'crowded': -1.5, 'delay': -1.5,
+    'delayed': -2, 'dirty': -2.5, 'disappointed': -2.5, 'disappointing': -2.5, 'expensive': -1.5,
+    'hate': -3, 'horrible': -3, 'lost': -1.5, 'meh': -1, 'nightmare': -3, 'noisy': -1.5, 'overpriced': -2,
+    'overrated': -2, 'poor': -2, 'rude': -2.5, 'scam': -3, 'stolen': -3, 'stressful': -2, 'terrible': -3,
+    'tired': -1, 'tourist-trap': -2.5, 'ugly': -2.5, 'unsafe': -2.5, 'worst': -3,
+}
+EMOJI_LEXICON = {
+    '😍': 3, '🥰': 3, '😊': 2, '😀': 2, '😁': 2, '😃': 2, '🤩': 3, '❤️': 3, '❤': 3, '💕': 2.5, '👍': 2,
+    '🙌': 2, '✨': 1, '🌅': 1, '🌴': 1, '🏖️': 1, '😎': 1.5, '🥳': 2.5, '😢': -2, '😭': -2.5, '😡': -3,
+    '😠': -2.5, '😞': -2, '👎': -2, '💔': -2.5, '🤮': -3, '😤': -2, '😩': -2,
+}
+NEGATIONS = {'not', 'no', 'never', "don't", "didn't", "isn't", "wasn't", "aren't", "won't", 'nothing', 'hardly'}
+TOKEN_RE = re.compile(r"[a-z][a-z'\-]*|" + '|'.join(re.escape(e) for e in sorted(EMOJI_LEXICON, key=len, reverse=True)))
+ALPHA = 15.0
+POSITIVE_THRESHOLD = 0.05
+
+
+def build_vocabulary():
+    vocabulary = {**LEXICON, **EMOJI_LEXICON}
+    ids = {token: i for i, token in enumerate(vocabulary)}
+    weights = np.fromiter(vocabulary.values(), dtype=np.float64, count=len(vocabulary))
+    return ids, weights
+
+
+TOKEN_IDS, TOKEN_WEIGHTS = build_vocabulary()
+
+
+def score_texts(texts: Sequence[str]) -> np.ndarray:
+    # Tokenising is per text; the weighting and per-document sums run as one vectorised pass over the batch.
+    # Scores are VADER-style normalised sums in [-1, 1].
+    doc_index, token_ids, signs = [], [], []
+    for doc, text in enumerate(texts):
+        negate = 0
+        for token in TOKEN_RE.findall(text.lower()):
+            token_id = TOKEN_IDS.get(token)
+            if token_id is not None:
+                doc_index.append(doc)
+                token_ids.append(token_id)
+                signs.append(-0.74 if negate else 1.0)
+            # A negation flips the sentiment of the next few tokens
+            negate = 3 if token in NEGATIONS or token.endswith("n't") else max(0, negate - 1)
+    totals = np.bincount(np.asarray(doc_index, dtype=np.int64),
+                         weights=TOKEN_WEIGHTS[np.asarray(token_ids, dtype=np.int64)] * np.asarray(signs),
+                         minlength=len(texts))
+    return totals / np.sqrt(totals * totals + ALPHA)
+
+
+def label_scores(scores: np.ndarray, threshold: float = POSITIVE_THRESHOLD) -> np.ndarray:
+    return np.where(scores >= threshold, 'Positive', np.where(scores <= -threshold, 'Negative', 'Neutral'))
+
+
+class SentimentScorer:
+    # Pipeline stage that scores `post_text` a batch at a time and writes `sentiment_score`/`sentiment` back into
+    # each record. With n_jobs > 1 the batch is split across worker processes, started on first use and stopped by
+    # close() (or leaving a `with` block); a closed scorer starts a fresh pool if it is used again.
+    def __init__(self, batch_size: int = 5000, n_jobs: int = 1, text_key: str = 'post_text'):
+        self.batch_size = batch_size
+        self.n_jobs = n_jobs
+        self.text_key = text_key
+        self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def score(self, texts: List[str]) -> np.ndarray:
+        if self.n_jobs <= 1 or len(texts) < 2 * self.n_jobs:
+            return score_texts(texts)
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.n_jobs)
+        size = math.ceil(len(texts) / self.n_jobs)
+        parts = [texts[i:i + size] for i in range(0, len(texts), size)]
+        return np.concatenate(list(self._pool.map(score_texts, parts)))
+
+    def _score_batch(self, batch: List[Dict]):
+        scores = self.score([record[self.text_key] or '' for record in batch])
+        for record, score, label in zip(batch, scores, label_scores(scores)):
+            record['sentiment_score'] = round(float(score), 4)
+            record['sentiment'] = str(label)
+
+    def observe(self, records: Iterable[Dict]) -> Iterator[Dict]:
+        batch = []
+        for record in records:
+            batch.append(record)
+            if len(batch) >= self.batch_size:
+                self._score_batch(batch)
+                yield from batch
+                batch = []
+        if batch:
+            self._score_batch(batch)
+            yield from batch
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
@@ -0,0 +1,64 @@
+from collections import Counter
+from itertools import chain
+from typing import Dict, Iterable, List, Tuple
+
+import pandas as pd
+
+
+class SummaryAggregator:
+    # One-pass collection summary. Partial aggregates from chunks or workers combine with merge(), and the
+    # result equals a single pass over all records. Hashtag counts are exact; memory grows with distinct tags.
+    def __init__(self):
+        self.total = 0
+        self.engagement_sum = 0
+        self.platforms: Dict[str, None] = {}
+        self.hashtag_counts = Counter()
+
+    def update(self, record: Dict):
+        self.total += 1
+        self.engagement_sum += record['engagement']
+        self.platforms.setdefault(record['platform'])
+        self.hashtag_counts.update(record['hashtags'])
+
+    def update_records(self, records: Iterable[Dict]):
+        for record in records:
+            self.update(record)
+
+    def update_frame(self, df: pd.DataFrame):
+        if df.empty:
+            return
+        self.total += len(df)
+        self.engagement_sum += df['engagement'].sum().item()
+        for platform in df['platform'].unique():
+            self.platforms.setdefault(platform)
+        self.hashtag_counts.update(chain.from_iterable(df['hashtags']))
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, chunksize: int = 100000) -> 'SummaryAggregator':
+        summary = cls()
+        for start in range(0, len(df), chunksize):
+            summary.update_frame(df.iloc[start:start + chunksize])
+        return summary
+
+    def merge(self, other: 'SummaryAggregator') -> 'SummaryAggregator':
+        self.total += other.total
+        self.engagement_sum += other.engagement_sum
+        for platform in other.platforms:
+            self.platforms.setdefault(platform)
+        self.hashtag_counts.update(other.hashtag_counts)
+        return self
+
+    def top_hashtags(self, k: int = 10) -> List[Tuple[str, int]]:
+        return self.hashtag_counts.most_common(k)
+
+    @property
+    def mean_engagement(self) -> float:
+        return self.engagement_sum / self.total if self.total else 0.0
+
+    def write(self, path: str):
+        with open(path, 'w') as f:
+            f.write(f"Travel Data Collection Summary\n{'='*40}\n\n")
+            f.write(f"Total posts: {self.total}\n")
+            f.write(f"Platforms: {', '.join(self.platforms)}\n")
+            f.write(f"Top hashtags: {dict(self.top_hashtags(10))}\n")
+            f.write(f"Average engagement: {self.mean_engagement:.2f}\n")
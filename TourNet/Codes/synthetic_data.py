@@ -0,0 +1,167 @@
+import argparse
+import logging
+import os
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Iterator
+
+import numpy as np
+import pandas as pd
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+DEFAULT_INPUT = "TourNet/Datasets/tournet_social_data.csv"
+DESTINATIONS = ['Santorini', 'Manali', 'Rome', 'Dharamshala', 'Tokyo', 'Cape Town', 'Amsterdam', 'Bali', 'Paris',
+                'New York']
+HASHTAGS = ['#travel', '#wanderlust', '#travelgram', '#vacation', '#adventure', '#travel2025', '#naturelovers',
+            '#vacationvibes']
+# Used when the source CSV is not available
+FALLBACK_TEMPLATES = ['Exploring the beauty of {place}! 🧳', 'Backpacking through {place} has been a dream come true!',
+                      "Can't get enough of {place} 😍", 'Sunsets in {place} hit different 🌅',
+                      'Just landed in {place}, ready for adventure ✈️']
+
+
+class SocialPostProfile:
+    # Distributions taken from tournet_social_data.csv: post templates, destinations, hashtag sets, sentiment mix,
+    # engagement and date range. Generated rows follow the same schema and marginals at any size.
+    def __init__(self, csv_path: str = DEFAULT_INPUT):
+        if os.path.exists(csv_path):
+            df = pd.read_csv(csv_path)
+            self.destinations = sorted(df['location'].dropna().unique())
+            templates = {post.replace(place, '{place}') for post, place in zip(df['post'], df['location'])
+                         if isinstance(post, str) and isinstance(place, str)}
+            self.templates = sorted(templates)
+            hashtag_sets = df['hashtags'].fillna('').value_counts(normalize=True)
+            self.hashtag_sets, self.hashtag_weights = hashtag_sets.index.tolist(), hashtag_sets.to_numpy()
+            sentiments = df['sentiment'].value_counts(normalize=True)
+            self.sentiments, self.sentiment_weights = sentiments.index.tolist(), sentiments.to_numpy()
+            self.engagement_range = (int(df['engagement'].min()), int(df['engagement'].max()))
+            dates = pd.to_datetime(df['date'])
+            self.date_range = (dates.min(), dates.max())
+        else:
+            self.destinations = DESTINATIONS
+            self.templates = FALLBACK_TEMPLATES
+            self.hashtag_sets, self.hashtag_weights = HASHTAGS, np.full(len(HASHTAGS), 1 / len(HASHTAGS))
+            self.sentiments, self.sentiment_weights = ['Positive', 'Neutral', 'Negative'], np.array([0.6, 0.25, 0.15])
+            self.engagement_range = (50, 9999)
+            self.date_range = (pd.Timestamp('2023-06-25'), pd.Timestamp('2025-06-24'))
+        self.posts = np.array([template.format(place=place) for template in self.templates
+                               for place in self.destinations], dtype=object)
+        self.post_places = np.array([place for _ in self.templates for place in self.destinations], dtype=object)
+
+    def frame(self, rows: int, seed: int = 0, variants: int = 1000, users: int = None) -> pd.DataFrame:
+        # `variants` appends a day marker to some posts, so the unique-post count grows with the data instead of
+        # staying at templates x destinations
+        rng = np.random.default_rng(seed)
+        post_index = rng.integers(0, len(self.posts), rows)
+        variant = rng.integers(0, variants + 1, rows) if variants else np.zeros(rows, dtype=np.int64)
+        posts = pd.Series(self.posts[post_index])
+        tagged = variant > 0
+        posts[tagged] = posts[tagged] + ' Day ' + pd.Series(variant[tagged], index=posts.index[tagged]).astype(str)
+        user_ids = rng.integers(0, users or max(rows, 1), rows)
+        start, end = self.date_range
+        days = rng.integers(0, (end - start).days + 1, rows)
+        low, high = self.engagement_range
+        return pd.DataFrame({
+            'username': 'traveler' + pd.Series(user_ids).astype(str),
+            'date': (start + pd.to_timedelta(days, unit='D')).strftime('%Y-%m-%d'),
+            'post': posts,
+            'location': self.post_places[post_index],
+            'hashtags': np.asarray(self.hashtag_sets, dtype=object)[
+                rng.choice(len(self.hashtag_sets), rows, p=self.hashtag_weights)],
+            'sentiment': np.asarray(self.sentiments, dtype=object)[
+                rng.choice(len(self.sentiments), rows, p=self.sentiment_weights)],
+            'engagement': rng.integers(low, high + 1, rows),
+        })
+
+    def iter_frames(self, rows: int, chunksize: int = 1_000_000, seed: int = 0, variants: int = 1000
+                    ) -> Iterator[pd.DataFrame]:
+        # Chunks use consecutive seeds, so any row count can be produced in bounded memory
+        for number, offset in enumerate(range(0, rows, chunksize)):
+            yield self.frame(min(chunksize, rows - offset), seed + number, variants, users=rows)
+
+
+def write_social_csv(path: str, rows: int, profile: SocialPostProfile = None, chunksize: int = 1_000_000,
+                     seed: int = 0, variants: int = 1000) -> str:
+    profile = profile or SocialPostProfile()
+    header = True
+    for frame in profile.iter_frames(rows, chunksize, seed, variants):
+        frame.to_csv(path, mode='w' if header else 'a', header=header, index=False)
+        header = False
+    return path
+
+
+def social_to_collector_frame(df: pd.DataFrame) -> pd.DataFrame:
+    # Maps tournet_social_data.csv rows onto the collect_all_data schema
+    hashtags = df['hashtags'].fillna('').str.split(r',\s*').map(lambda tags: [tag for tag in tags if tag])
+    frame = pd.DataFrame({
+        'platform': 'Twitter',
+        'post_text': df['post'].fillna('').astype(str),
+        'username': df['username'].astype(str),
+        'timestamp': pd.to_datetime(df['date']).dt.strftime('%Y-%m-%dT%H:%M:%S'),
+        'hashtags': hashtags,
+        'location': df['location'].fillna(''),
+        'likes': df['engagement'],
+        'retweets': 0,
+        'replies': 0,
+        'engagement': df['engagement'],
+        'url': 'https://twitter.com/i/web/status/' + df.index.astype(str),
+        'search_hashtag': hashtags.map(lambda tags: tags[0] if tags else '#travel'),
+    })
+    frame['post_length'] = frame['post_text'].str.len()
+    frame['hashtag_count'] = frame['hashtags'].map(len)
+    frame['engagement_rate'] = frame['engagement'] / (frame['engagement'].max() + 1)
+    return frame
+
+
+def synthetic_collector_frame(rows: int, seed: int = 0) -> pd.DataFrame:
+    # Rows shaped like collect_all_data output, with a Twitter/Blog mix similar to a real run
+    rng = random.Random(seed)
+    records = []
+    for i in range(rows):
+        platform = 'Twitter' if rng.random() < 0.8 else 'Blog'
+        place = rng.choice(DESTINATIONS)
+        tags = rng.sample(HASHTAGS, rng.randint(0, 4))
+        text = f"Day {i % 30} exploring {place}! {' '.join(tags)}"
+        likes, retweets, replies = rng.randint(0, 5000), rng.randint(0, 500), rng.randint(0, 200)
+        records.append({
+            'platform': platform,
+            'post_text': text,
+            'username': f"user_{rng.randint(1, rows // 5 + 1)}",
+            'timestamp': (datetime(2025, 1, 1) + timedelta(minutes=i)).isoformat(),
+            'hashtags': tags,
+            'location': place if platform == 'Twitter' else '',
+            'likes': likes,
+            'retweets': retweets,
+            'replies': replies,
+            'engagement': likes + retweets + replies,
+            'url': f"https://example.com/{platform.lower()}/{i}",
+            'search_hashtag': tags[0] if tags else 'blog',
+        })
+    df = pd.DataFrame(records)
+    df['post_length'] = df['post_text'].str.len()
+    df['hashtag_count'] = df['hashtags'].apply(len)
+    df['engagement_rate'] = df['engagement'] / (df['engagement'].max() + 1)
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a synthetic TourNet social CSV of any size")
+    parser.add_argument('rows', type=int)
+    parser.add_argument('--output', default='tournet_social_synthetic.csv')
+    parser.add_argument('--input', default=DEFAULT_INPUT, help="CSV the distributions are taken from")
+    parser.add_argument('--chunksize', type=int, default=1_000_000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--variants', type=int, default=1000)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    write_social_csv(args.output, args.rows, SocialPostProfile(args.input), args.chunksize, args.seed,
+                     args.variants)
+    logger.info(f"Wrote {args.rows} rows to {args.output} in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,25 +1,99 @@
 import pandas as pd
+import functools
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
 import time
 import json
 import re
-from datetime import datetime
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
 import logging
-from typing import List, Dict
+from typing import List, Dict, Iterator
+from urllib.parse import urlsplit
 import tweepy
 
+from checkpoint_store import CheckpointStore
+from columnar_store import write_partitioned
+from html_parsers import get_parser_backend
+from influencer_index import InfluencerIndex
+from metrics import BYTES_BUCKETS, MetricsRegistry, profiled
+from near_dedup import NearDuplicateFilter
+from rate_limiter import RateLimitScheduler
+from record_pipeline import DEDUP_MAX_KEYS, ChunkedRecordWriter, normalize_records
+from sentiment import SentimentScorer
+from summary_stats import SummaryAggregator
+from trending import TrendingEngine
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+BLOG_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64)',
+    'Accept-Language': 'en-US,en;q=0.9',
+    'Referer': 'https://www.google.com/'
+}
+TRAVEL_KEYWORDS = ['travel', 'trip', 'vacation', 'journey', 'destination']
+
+
+class HostThrottle:
+    # Caps in-flight requests to one host and spaces consecutive requests by `delay` seconds
+    def __init__(self, limit: int, delay: float):
+        self.semaphore = threading.BoundedSemaphore(limit)
+        self.delay = delay
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def __enter__(self):
+        self.semaphore.acquire()
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self.delay
+        if wait > 0:
+            time.sleep(wait)
+        return self
+
+    def __exit__(self, *exc):
+        self.semaphore.release()
+        return False
+
+
 class TravelDataCollector:
-    def __init__(self, twitter_bearer_token=None):
+    def __init__(self, twitter_bearer_token=None, max_workers: int = 16, per_host_limit: int = 2,
+                 request_delay: float = 2.0, tweepy_client=None, rate_limiter: RateLimitScheduler = None,
+                 hashtag_workers: int = 3, checkpoint_store: CheckpointStore = None,
+                 parser_backend: str = 'auto', near_duplicate_threshold: float = None,
+                 trending_engine: TrendingEngine = None, influencer_index: InfluencerIndex = None,
+                 sentiment_scorer: SentimentScorer = None, metrics: MetricsRegistry = None,
+                 dedup_max_keys: int = DEDUP_MAX_KEYS):
         self.target_hashtags = ['#travel', '#wanderlust', '#travelgram', '#vacation', '#adventure']
-        self.tweepy_client = None
+        self.tweepy_client = tweepy_client
+        self.rate_limiter = rate_limiter or RateLimitScheduler(
+            retry_on=(tweepy.TooManyRequests, tweepy.TwitterServerError)
+        )
+        self.hashtag_workers = hashtag_workers
+        self.checkpoint_store = checkpoint_store
+        self.parser = get_parser_backend(parser_backend)
+        # Exact dedup remembers only the last `dedup_max_keys` unique posts; older repeats come through again
+        self.dedup_max_keys = dedup_max_keys
+        self.near_dedup = NearDuplicateFilter(near_duplicate_threshold) if near_duplicate_threshold else None
+        self.trending = trending_engine
+        self.influencers = influencer_index
+        self.sentiment = sentiment_scorer
+        self.metrics = metrics or MetricsRegistry()
+        self._run_id = None
+        self.max_workers = max_workers
+        self.per_host_limit = per_host_limit
+        self.request_delay = request_delay
+        self._local = threading.local()
+        self._host_throttles: Dict[str, HostThrottle] = {}
+        self._host_throttles_lock = threading.Lock()
 
-        if twitter_bearer_token:
-            self.tweepy_client = tweepy.Client(bearer_token=twitter_bearer_token, wait_on_rate_limit=True)
+        if twitter_bearer_token and not tweepy_client:
+            # Rate limits are handled by the shared scheduler, so tweepy must surface 429s instead of sleeping
+            self.tweepy_client = tweepy.Client(bearer_token=twitter_bearer_token, wait_on_rate_limit=False)
             logger.info("Twitter API v2 client initialized")
 
     def collect_twitter_data_v2(self, hashtag: str, limit: int = 100) -> List[Dict]:
@@ -27,127 +101,311 @@ class TravelDataCollector:
             return []
 
         tweets_data = []
+        tweet_ids = []
+        store = self.checkpoint_store
+        since_id = store.get_since_id(hashtag) if store else None
+        start = time.perf_counter()
         try:
-            tweets = tweepy.Paginator(
-                self.tweepy_client.search_recent_tweets,
+            pages = tweepy.Paginator(
+                self.rate_limiter.wrap(self._timed_call(self.tweepy_client.search_recent_tweets, 'api.twitter.com')),
                 query=f"{hashtag} -is:retweet lang:en",
                 tweet_fields=['created_at', 'author_id', 'public_metrics', 'entities', 'geo'],
                 expansions=['author_id', 'geo.place_id'],
                 user_fields=['username'],
                 place_fields=['full_name'],
-                max_results=min(limit, 100)
-            ).flatten(limit=limit)
-
-            for tweet in tweets:
-                hashtags = [f"#{tag['tag']}" for tag in tweet.entities.get('hashtags', [])] if tweet.entities else []
-                metrics = tweet.public_metrics or {}
-                location = tweet.geo.get('place_id') if tweet.geo else None
-
-                tweets_data.append({
-                    'platform': 'Twitter',
-                    'post_text': tweet.text,
-                    'username': f"user_{tweet.author_id}",
-                    'timestamp': tweet.created_at.isoformat() if tweet.created_at else '',
-                    'hashtags': hashtags,
-                    'location': location or '',
-                    'likes': metrics.get('like_count', 0),
-                    'retweets': metrics.get('retweet_count', 0),
-                    'replies': metrics.get('reply_count', 0),
-                    'engagement': sum([metrics.get(k, 0) for k in ['like_count', 'retweet_count', 'reply_count']]),
-                    'url': f"https://twitter.com/i/web/status/{tweet.id}",
-                    'search_hashtag': hashtag
-                })
+                max_results=min(limit, 100),
+                since_id=since_id
+            )
 
-            logger.info(f"Collected {len(tweets_data)} tweets for {hashtag}")
+            fetched = 0
+            for page in pages:
+                tweets = (page.data or [])[:limit - fetched]
+                fetched += len(tweets)
+                # One seen-ID lookup per page of results
+                unseen = store.filter_unseen(tweet.id for tweet in tweets) if store else None
+                tweets_data.extend(self._tweet_record(tweet, hashtag) for tweet in tweets
+                                   if unseen is None or tweet.id in unseen)
+                tweet_ids.extend(tweet.id for tweet in tweets)
+                if fetched >= limit:
+                    break
+
+            logger.info(f"Collected {len(tweets_data)} tweets for {hashtag}" +
+                        (f" since id {since_id}" if since_id else ""))
+            # Seen IDs and since_id are staged with the task; finish_run applies them once the output is saved
+            self._checkpoint(f"hashtag:{hashtag}", tweets_data, {
+                'seen': tweet_ids, 'since_id': {hashtag: max(tweet_ids)} if tweet_ids else {},
+            })
         except tweepy.TooManyRequests:
-            logger.warning(f"Rate limit hit for {hashtag}. Waiting for 2 minutes...")
-            time.sleep(120)
-            return self.collect_twitter_data_v2(hashtag, limit)
+            logger.warning(f"Rate limit retries exhausted for {hashtag}; keeping {len(tweets_data)} tweets")
+            self.metrics.inc('errors_total', stage='twitter', reason='rate_limit')
         except Exception as e:
             logger.error(f"Error collecting tweets for {hashtag}: {e}")
+            self.metrics.inc('errors_total', stage='twitter', reason=type(e).__name__)
+        self.metrics.observe('fetch_seconds', time.perf_counter() - start, stage='twitter')
+        self.metrics.inc('records_fetched_total', len(tweets_data), host='api.twitter.com')
         return tweets_data
 
+    def _tweet_record(self, tweet, hashtag: str) -> Dict:
+        hashtags = [f"#{tag['tag']}" for tag in tweet.entities.get('hashtags', [])] if tweet.entities else []
+        metrics = tweet.public_metrics or {}
+        location = tweet.geo.get('place_id') if tweet.geo else None
+        return {
+            'platform': 'Twitter',
+            'post_text': tweet.text,
+            'username': f"user_{tweet.author_id}",
+            'timestamp': tweet.created_at.isoformat() if tweet.created_at else '',
+            'hashtags': hashtags,
+            'location': location or '',
+            'likes': metrics.get('like_count', 0),
+            'retweets': metrics.get('retweet_count', 0),
+            'replies': metrics.get('reply_count', 0),
+            'engagement': sum([metrics.get(k, 0) for k in ['like_count', 'retweet_count', 'reply_count']]),
+            'url': f"https://twitter.com/i/web/status/{tweet.id}",
+            'search_hashtag': hashtag
+        }
+
+    def _timed_call(self, func, host: str):
+        # Times each API attempt, retries included; wraps keeps the name tweepy.Paginator dispatches on
+        @functools.wraps(func)
+        def timed(*args, **kwargs):
+            with self.metrics.timer('http_response_seconds', host=host):
+                return func(*args, **kwargs)
+        return timed
+
+    def _checkpoint(self, task: str, records: List[Dict], state: Dict = None):
+        if self.checkpoint_store and self._run_id is not None:
+            self.checkpoint_store.complete_task(self._run_id, task, records, state)
+
+    def _finish_run(self):
+        # Called once the run's output is written: only then are its tweets marked seen and its validators kept
+        if self.checkpoint_store and self._run_id is not None:
+            self.checkpoint_store.finish_run(self._run_id)
+            self._run_id = None
+
+    def _get_session(self) -> requests.Session:
+        # One keep-alive session per worker thread; requests.Session is not safe to share across threads
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=self.max_workers, pool_maxsize=self.per_host_limit)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            session.headers.update(BLOG_HEADERS)
+            self._local.session = session
+        return session
+
+    def _get_host_throttle(self, url: str) -> HostThrottle:
+        host = urlsplit(url).netloc
+        with self._host_throttles_lock:
+            throttle = self._host_throttles.get(host)
+            if throttle is None:
+                throttle = HostThrottle(self.per_host_limit, self.request_delay)
+                self._host_throttles[host] = throttle
+        return throttle
+
+    def parse_blog_html(self, url: str, html: str) -> List[Dict]:
+        posts = []
+        for title_text, content in self.parser.extract_posts(html):
+            if any(keyword in content.lower() for keyword in TRAVEL_KEYWORDS):
+                posts.append({
+                    'platform': 'Blog',
+                    'post_text': f"{title_text}\n\n{content}",
+                    'username': url.split('//')[1].split('/')[0],
+                    'timestamp': datetime.now(timezone.utc).isoformat(),
+                    'hashtags': re.findall(r'#\w+', content),
+                    'location': '',
+                    'likes': 0,
+                    'retweets': 0,
+                    'replies': 0,
+                    'engagement': 0,
+                    'url': url,
+                    'search_hashtag': 'blog'
+                })
+        return posts
+
     def scrape_blog_simple(self, url: str) -> List[Dict]:
         posts = []
+        store = self.checkpoint_store
+        host = urlsplit(url).netloc
         try:
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64)',
-                'Accept-Language': 'en-US,en;q=0.9',
-                'Referer': 'https://www.google.com/'
-            }
-            response = requests.get(url, headers=headers, timeout=15)
+            validators = store.get_validators(url) if store else {}
+            start = time.perf_counter()
+            response = self._get_session().get(url, headers=validators, timeout=15)
+            self._record_response(host, response, time.perf_counter() - start)
+            if response.status_code == 304:
+                logger.info(f"Not modified since last run: {url}")
+                self._checkpoint(f"url:{url}", posts)
+                return posts
             response.raise_for_status()
-
-            soup = BeautifulSoup(response.text, 'html.parser')
-            for selector in ['article', '.post', '.blog-post', '.entry']:
-                elements = soup.select(selector)
-                if elements:
-                    for elem in elements[:5]:
-                        title = elem.find(['h1', 'h2', 'h3'])
-                        title_text = title.get_text(strip=True) if title else "No title"
-                        content = elem.get_text(strip=True)[:500]
-                        travel_keywords = ['travel', 'trip', 'vacation', 'journey', 'destination']
-                        if any(keyword in content.lower() for keyword in travel_keywords):
-                            posts.append({
-                                'platform': 'Blog',
-                                'post_text': f"{title_text}\n\n{content}",
-                                'username': url.split('//')[1].split('/')[0],
-                                'timestamp': datetime.now().isoformat(),
-                                'hashtags': re.findall(r'#\w+', content),
-                                'location': '',
-                                'likes': 0,
-                                'retweets': 0,
-                                'replies': 0,
-                                'engagement': 0,
-                                'url': url,
-                                'search_hashtag': 'blog'
-                            })
-                    break
+            with self.metrics.timer('parse_seconds', host=host):
+                posts = self.parse_blog_html(url, response.text)
+            self.metrics.inc('records_fetched_total', len(posts), host=host)
             logger.info(f"Collected {len(posts)} posts from {url}")
+            self._checkpoint(f"url:{url}", posts, {
+                'validators': {url: [response.headers.get('ETag'), response.headers.get('Last-Modified')]},
+            })
         except Exception as e:
             logger.error(f"Error scraping {url}: {e}")
+            self.metrics.inc('errors_total', stage='blog', reason=type(e).__name__)
         return posts
 
-    def collect_all_data(self, tweet_limit: int = 50, blog_urls: List[str] = None) -> pd.DataFrame:
-        all_data = []
+    def _record_response(self, host: str, response: requests.Response, total: float):
+        # response.elapsed stops when the headers are parsed, so it covers DNS, connect and time to first byte;
+        # the rest of the call is the body download
+        headers = response.elapsed.total_seconds()
+        self.metrics.observe('http_response_seconds', headers, host=host)
+        self.metrics.observe('http_download_seconds', max(0.0, total - headers), host=host)
+        self.metrics.observe('http_response_bytes', len(response.content), buckets=BYTES_BUCKETS, host=host)
+        self.metrics.inc('http_bytes_total', len(response.content), host=host)
+        self.metrics.inc('http_responses_total', host=host, status=response.status_code)
 
-        for hashtag in self.target_hashtags:
-            tweets = self.collect_twitter_data_v2(hashtag, tweet_limit)
-            all_data.extend(tweets)
-            time.sleep(2)  # Avoid rapid hitting API
+    def _scrape_blog_polite(self, url: str) -> List[Dict]:
+        start = time.perf_counter()
+        with self._get_host_throttle(url):
+            self.metrics.observe('host_throttle_wait_seconds', time.perf_counter() - start,
+                                 host=urlsplit(url).netloc)
+            return self.scrape_blog_simple(url)
 
-        if blog_urls:
+    def iter_blogs_concurrent(self, urls: List[str]) -> Iterator[List[Dict]]:
+        # Bounded pool = global concurrency limit; HostThrottle = per-host politeness. Output keeps input order.
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='blog') as pool:
+            yield from pool.map(self._scrape_blog_polite, urls)
+
+    def scrape_blogs_concurrent(self, urls: List[str]) -> List[Dict]:
+        posts = []
+        for url_posts in self.iter_blogs_concurrent(urls):
+            posts.extend(url_posts)
+        logger.info(f"Collected {len(posts)} posts from {len(urls)} blogs")
+        return posts
+
+    def iter_records(self, tweet_limit: int = 50, blog_urls: List[str] = None,
+                     concurrent: bool = False) -> Iterator[Dict]:
+        hashtags = self.target_hashtags
+        store = self.checkpoint_store
+
+        if store:
+            # Tasks finished by an interrupted run are restored instead of fetched again
+            self._run_id = store.begin_run()
+            done = store.completed_tasks(self._run_id)
+            for records in done.values():
+                yield from records
+            if done:
+                logger.info(f"Resuming run {self._run_id}: {len(done)} tasks already complete")
+            hashtags = [h for h in hashtags if f"hashtag:{h}" not in done]
+            blog_urls = [u for u in blog_urls or [] if f"url:{u}" not in done]
+
+        if concurrent and self.tweepy_client:
+            # The shared token bucket keeps parallel hashtag fetches within the API quota
+            with ThreadPoolExecutor(max_workers=self.hashtag_workers, thread_name_prefix='twitter') as pool:
+                for tweets in pool.map(lambda tag: self.collect_twitter_data_v2(tag, tweet_limit), hashtags):
+                    yield from tweets
+        else:
+            for hashtag in hashtags:
+                tweets = self.collect_twitter_data_v2(hashtag, tweet_limit)
+                yield from tweets
+                time.sleep(2)  # Avoid rapid hitting API
+                self.metrics.inc('sleep_seconds_total', 2, stage='twitter')
+
+        if blog_urls and concurrent:
+            for posts in self.iter_blogs_concurrent(blog_urls):
+                yield from posts
+        elif blog_urls:
             for url in blog_urls:
                 posts = self.scrape_blog_simple(url)
-                all_data.extend(posts)
-                time.sleep(2)
-
-        df = pd.DataFrame(all_data)
-        if not df.empty:
-            df = df.drop_duplicates(subset=['post_text', 'username'], keep='first')
-            df['post_length'] = df['post_text'].str.len()
-            df['hashtag_count'] = df['hashtags'].apply(len)
-            df['engagement_rate'] = df['engagement'] / (df['engagement'].max() + 1)
-            logger.info(f"Collected {len(df)} unique posts")
+                yield from posts
+                time.sleep(self.request_delay)
+                self.metrics.inc('sleep_seconds_total', self.request_delay, stage='blog')
+
+    def _pipeline(self, tweet_limit: int, blog_urls: List[str], concurrent: bool) -> Iterator[Dict]:
+        # Record counts between stages show where posts are dropped
+        records = self.metrics.count(self.iter_records(tweet_limit, blog_urls, concurrent), 'collected')
+        records = self.metrics.count(normalize_records(records, self.dedup_max_keys), 'unique')
+        return self.metrics.count(self._filtered(records), 'filtered')
+
+    def _record_rate_limit_stats(self):
+        for key, value in self.rate_limiter.stats.items():
+            self.metrics.set(f'rate_limit_{key}', value)
+
+    def _filtered(self, records: Iterator[Dict]) -> Iterator[Dict]:
+        if self.near_dedup:
+            records = self.near_dedup.filter(records)
+        if self.sentiment:
+            records = self.sentiment.observe(records)
+        if self.trending:
+            records = self.trending.observe(records)
+        if self.influencers is not None:
+            records = self.influencers.observe(records)
+        return records
+
+    def collect_all_data(self, tweet_limit: int = 50, blog_urls: List[str] = None, concurrent: bool = False,
+                         profiler: str = None, profile_output: str = 'collect_all_data') -> pd.DataFrame:
+        # profiler: None, 'cprofile' or 'sampling'; see metrics.profiled
+        with profiled(profiler, profile_output):
+            # Exact duplicates are dropped before the filters so the trending and influencer taps count each post once
+            try:
+                with self.metrics.timer('stage_seconds', stage='collect'):
+                    records = list(self._pipeline(tweet_limit, blog_urls, concurrent))
+            finally:
+                # Shut down sentiment worker processes; the scorer starts new ones if the collector runs again
+                if self.sentiment:
+                    self.sentiment.close()
+            with self.metrics.timer('stage_seconds', stage='dataframe'):
+                df = pd.DataFrame(records)
+                if not df.empty:
+                    df = df.drop_duplicates(subset=['post_text', 'username'], keep='first')
+                    df['post_length'] = df['post_text'].str.len()
+                    df['hashtag_count'] = df['hashtags'].apply(len)
+                    df['engagement_rate'] = df['engagement'] / (df['engagement'].max() + 1)
+                    logger.info(f"Collected {len(df)} unique posts")
+        self._record_rate_limit_stats()
+        if self.near_dedup:
+            logger.info(f"Dropped {self.near_dedup.stats['duplicates']} near-duplicate posts so far")
         return df
 
-    def save_data(self, df: pd.DataFrame, filename: str = None):
+    def save_data(self, df: pd.DataFrame, filename: str = None, output_format: str = 'csv'):
+        if output_format not in ('csv', 'parquet'):
+            raise ValueError(f"Unknown output format '{output_format}', expected 'csv' or 'parquet'")
         if df.empty:
             logger.warning("No data to save")
-            return
+        else:
+            with self.metrics.timer('stage_seconds', stage='save'):
+                self._save_data(df, filename, output_format)
+        self._finish_run()
+
+    def _save_data(self, df: pd.DataFrame, filename: str, output_format: str):
+        if output_format == 'parquet':
+            # filename is the dataset root; repeated runs append partitions under it
+            filename = filename or "travel_data"
+            files = write_partitioned(df, f"{filename}_parquet")
+            logger.info(f"Data saved to {len(files)} Parquet files under {filename}_parquet/")
+        else:
+            if not filename:
+                filename = f"travel_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+            df.to_csv(f"{filename}.csv", index=False)
+            logger.info(f"Data saved to {filename}.csv")
+            df.to_json(f"{filename}.json", orient='records', indent=2)
+            logger.info(f"Data saved to {filename}.json")
+        SummaryAggregator.from_frame(df).write(f"{filename}_summary.txt")
+        logger.info(f"Summary saved to {filename}_summary.txt")
+
+    def collect_to_files(self, filename: str = None, tweet_limit: int = 50, blog_urls: List[str] = None,
+                         concurrent: bool = False, chunk_size: int = 1000) -> int:
+        # Streaming alternative to collect_all_data + save_data: memory is bounded by chunk_size
         if not filename:
             filename = f"travel_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-        df.to_csv(f"{filename}.csv", index=False)
-        logger.info(f"Data saved to {filename}.csv")
-        df.to_json(f"{filename}.json", orient='records', indent=2)
-        logger.info(f"Data saved to {filename}.json")
-        with open(f"{filename}_summary.txt", 'w') as f:
-            f.write(f"Travel Data Collection Summary\n{'='*40}\n\n")
-            f.write(f"Total posts: {len(df)}\n")
-            f.write(f"Platforms: {', '.join(df['platform'].unique())}\n")
-            f.write(f"Top hashtags: {df.explode('hashtags')['hashtags'].value_counts().head(10).to_dict()}\n")
-            f.write(f"Average engagement: {df['engagement'].mean():.2f}\n")
-        logger.info(f"Summary saved to {filename}_summary.txt")
+        with ChunkedRecordWriter(filename, chunk_size) as writer:
+            try:
+                with self.metrics.timer('stage_seconds', stage='collect'):
+                    writer.write(self._pipeline(tweet_limit, blog_urls, concurrent))
+            finally:
+                if self.sentiment:
+                    self.sentiment.close()
+            with self.metrics.timer('stage_seconds', stage='save'):
+                total = writer.finalize()
+        self._finish_run()
+        self._record_rate_limit_stats()
+        logger.info(f"Collected {total} unique posts")
+        return total
 
 def main():
     blog_urls = [
@@ -529,27 +787,33 @@ def main():
     ]
 
 
-    collector = TravelDataCollector(
-        twitter_bearer_token="YOUR_TWITTER_BEARER_TOKEN_HERE"
-    )
-
-    try:
-        print("Starting data collection...")
-        df = collector.collect_all_data(
-            tweet_limit=30,
-            blog_urls=blog_urls
+    with SentimentScorer() as sentiment_scorer:
+        collector = TravelDataCollector(
+            twitter_bearer_token="YOUR_TWITTER_BEARER_TOKEN_HERE",
+            checkpoint_store=CheckpointStore('tournet_state.sqlite'),
+            near_duplicate_threshold=0.8,
+            sentiment_scorer=sentiment_scorer
         )
-        if not df.empty:
-            print(f"\nCollection complete! Total posts: {len(df)}")
-            print(f"Platforms: {', '.join(df['platform'].unique())}")
-            print("\nSample data:")
-            print(df[['platform', 'username', 'engagement', 'hashtag_count']].head())
-            collector.save_data(df)
-            print("Data saved successfully!")
-        else:
-            print("No data collected. Check internet connection or API token.")
-    except Exception as e:
-        print(f"Error: {e}")
+
+        try:
+            print("Starting data collection...")
+            df = collector.collect_all_data(
+                tweet_limit=30,
+                blog_urls=blog_urls,
+                concurrent=True
+            )
+            if not df.empty:
+                print(f"\nCollection complete! Total posts: {len(df)}")
+                print(f"Platforms: {', '.join(df['platform'].unique())}")
+                print("\nSample data:")
+                print(df[['platform', 'username', 'engagement', 'hashtag_count', 'sentiment']].head())
+                collector.save_data(df)
+                print("Data saved successfully!")
+                collector.metrics.write('tournet_metrics.prom')
+            else:
+                print("No data collected. Check internet connection or API token.")
+        except Exception as e:
+            print(f"Error: {e}")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,211 @@
+import hashlib
+import heapq
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from gazetteer import DEFAULT_ALIASES, DEFAULT_DESTINATIONS, GazetteerMatcher
+from record_pipeline import as_utc, parse_utc
+
+# window name -> (bucket size in seconds, buckets per window)
+DEFAULT_WINDOWS = {
+    'hour': (300, 12),
+    'day': (3600, 24),
+    'week': (86400, 7),
+}
+
+
+class CountMinSketch:
+    def __init__(self, width: int = 2048, depth: int = 4):
+        self.width = width
+        self.depth = depth
+        self.table = np.zeros((depth, width), dtype=np.int64)
+        self._rows = np.arange(depth)
+
+    def columns(self, item: str) -> np.ndarray:
+        # Double hashing: depth indexes from one 64-bit digest. Sketches of equal shape share columns, so
+        # callers updating several of them hash once and pass `columns` in.
+        digest = int.from_bytes(hashlib.blake2b(item.encode('utf-8'), digest_size=8).digest(), 'little')
+        h1, h2 = digest & 0xFFFFFFFF, (digest >> 32) | 1
+        return (h1 + self._rows * h2) % self.width
+
+    def add(self, item: str, count: int = 1, columns: np.ndarray = None):
+        self.table[self._rows, self.columns(item) if columns is None else columns] += count
+
+    def estimate(self, item: str) -> int:
+        return int(self.table[self._rows, self.columns(item)].min())
+
+    def merge(self, other: 'CountMinSketch', sign: int = 1):
+        self.table += sign * other.table
+
+    def clear(self):
+        self.table[:] = 0
+
+
+class SpaceSaving:
+    # Space-Saving heavy hitters with a lazy min-heap; counts are upper bounds, overestimated by at most `error`
+    def __init__(self, capacity: int = 100):
+        self.capacity = capacity
+        self.counts: Dict[str, int] = {}
+        self.errors: Dict[str, int] = {}
+        self._heap: List[Tuple[int, str]] = []
+
+    def add(self, item: str, count: int = 1):
+        if item in self.counts:
+            self.counts[item] += count
+        elif len(self.counts) < self.capacity:
+            self.counts[item] = count
+            self.errors[item] = 0
+        else:
+            floor, victim = self._pop_min()
+            del self.counts[victim]
+            del self.errors[victim]
+            self.counts[item] = floor + count
+            self.errors[item] = floor
+        heapq.heappush(self._heap, (self.counts[item], item))
+        if len(self._heap) > 4 * self.capacity:
+            self._heap = [(c, i) for i, c in self.counts.items()]
+            heapq.heapify(self._heap)
+
+    def _pop_min(self) -> Tuple[int, str]:
+        while True:
+            count, item = heapq.heappop(self._heap)
+            if self.counts.get(item) == count:
+                return count, item
+
+    def items(self) -> Iterable[str]:
+        return self.counts.keys()
+
+    def clear(self):
+        self.counts.clear()
+        self.errors.clear()
+        self._heap.clear()
+
+
+class SlidingWindow:
+    # Ring of 2 * `buckets` time buckets. The newest `buckets` form the current window and the rest the
+    # previous one, so growth compares like with like. Window totals are running Count-Min aggregates, updated
+    # as buckets rotate, so queries never touch history.
+    def __init__(self, bucket_seconds: int, buckets: int, width: int = 2048, depth: int = 4, top_k: int = 100):
+        self.bucket_seconds = bucket_seconds
+        self.buckets = buckets
+        self._sketches = [CountMinSketch(width, depth) for _ in range(2 * buckets)]
+        self._heavy = [SpaceSaving(top_k) for _ in range(2 * buckets)]
+        self.current = CountMinSketch(width, depth)
+        self.previous = CountMinSketch(width, depth)
+        self._dirty = set()
+        self._head: Optional[int] = None
+
+    def _advance(self, bucket: int):
+        if self._head is None:
+            self._head = bucket
+            return
+        if bucket - self._head >= 2 * self.buckets:
+            for slot in self._dirty:
+                self._sketches[slot].clear()
+                self._heavy[slot].clear()
+            self._dirty.clear()
+            self.current.clear()
+            self.previous.clear()
+            self._head = bucket
+            return
+        while self._head < bucket:
+            self._head += 1
+            # Bucket leaving the current window moves to the previous one; the oldest bucket expires.
+            # Empty buckets are skipped, so idle gaps cost nothing.
+            crossing = (self._head - self.buckets) % (2 * self.buckets)
+            if crossing in self._dirty:
+                self.current.merge(self._sketches[crossing], -1)
+                self.previous.merge(self._sketches[crossing])
+            expiring = self._head % (2 * self.buckets)
+            if expiring in self._dirty:
+                self.previous.merge(self._sketches[expiring], -1)
+                self._sketches[expiring].clear()
+                self._heavy[expiring].clear()
+                self._dirty.discard(expiring)
+
+    def add(self, item: str, epoch: float, count: int = 1, columns: np.ndarray = None) -> bool:
+        bucket = int(epoch // self.bucket_seconds)
+        if self._head is not None and bucket <= self._head - 2 * self.buckets:
+            return False
+        self._advance(bucket)
+        if columns is None:
+            columns = self.current.columns(item)
+        slot = bucket % (2 * self.buckets)
+        self._dirty.add(slot)
+        self._sketches[slot].add(item, count, columns)
+        self._heavy[slot].add(item, count)
+        if bucket > self._head - self.buckets:
+            self.current.add(item, count, columns)
+        else:
+            self.previous.add(item, count, columns)
+        return True
+
+    def top(self, n: int = 10) -> List[Tuple[str, int, float]]:
+        if self._head is None:
+            return []
+        candidates = set()
+        for offset in range(self.buckets):
+            candidates.update(self._heavy[(self._head - offset) % (2 * self.buckets)].items())
+        ranked = []
+        for item in candidates:
+            count = self.current.estimate(item)
+            before = self.previous.estimate(item)
+            ranked.append((item, count, (count - before) / max(before, 1)))
+        ranked.sort(key=lambda entry: (-entry[1], entry[0]))
+        return ranked[:n]
+
+
+def record_epoch(record: Dict) -> float:
+    timestamp = record.get('timestamp')
+    if not timestamp:
+        return datetime.now(timezone.utc).timestamp()
+    if isinstance(timestamp, str):
+        return parse_utc(timestamp).timestamp()
+    # Naive values are host-local time (see as_utc), not UTC
+    return as_utc(timestamp).timestamp()
+
+
+class TrendingEngine:
+    # Incremental hashtag/destination trends over hour, day and week windows. Each post costs a fixed number of
+    # sketch updates. Destinations are gazetteer matches in the post text (the TourNet destinations by default):
+    # collector records carry an opaque place ID or nothing in `location`, so it is not used.
+    def __init__(self, windows: Dict[str, Tuple[int, int]] = None, matcher: GazetteerMatcher = None,
+                 width: int = 2048, depth: int = 4, top_k: int = 100):
+        self.matcher = matcher or GazetteerMatcher.from_destinations(DEFAULT_DESTINATIONS, DEFAULT_ALIASES)
+        self.windows = {
+            dimension: {name: SlidingWindow(size, count, width, depth, top_k)
+                        for name, (size, count) in (windows or DEFAULT_WINDOWS).items()}
+            for dimension in ('hashtag', 'destination')
+        }
+        self._hasher = CountMinSketch(width, depth)
+        self.posts = 0
+        self.late_updates = 0
+
+    def _destinations(self, record: Dict) -> List[str]:
+        return self.matcher.find(record.get('post_text') or '')
+
+    def update(self, record: Dict):
+        epoch = record_epoch(record)
+        items = {
+            'hashtag': [tag.lower() for tag in record.get('hashtags') or []],
+            'destination': self._destinations(record),
+        }
+        self.posts += 1
+        for dimension, values in items.items():
+            for value in values:
+                columns = self._hasher.columns(value)
+                for window in self.windows[dimension].values():
+                    if not window.add(value, epoch, columns=columns):
+                        self.late_updates += 1
+
+    def observe(self, records: Iterable[Dict]) -> Iterator[Dict]:
+        # Pass-through tap for a record stream, e.g. collector.iter_records()
+        for record in records:
+            self.update(record)
+            yield record
+
+    def top(self, dimension: str = 'hashtag', window: str = 'day', n: int = 10) -> List[Tuple[str, int, float]]:
+        # (item, estimated count in the window, growth vs the previous window of equal length)
+        return self.windows[dimension][window].top(n)
@@ -0,0 +1,357 @@
+import argparse
+import hashlib
+import io
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow.feather as feather
+except ImportError:
+    feather = None
+
+logger = logging.getLogger(__name__)
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+CACHE_DIR = Path(os.environ.get('DATASET_CACHE_DIR', REPO_ROOT / '.dataset_cache'))
+# Bump when the loader's output changes in a way cached files would not reflect
+CACHE_VERSION = 1
+
+
+@dataclass
+class DatasetSchema:
+    path: str
+    categoricals: List[str] = field(default_factory=list)
+    timestamps: Dict[str, str] = field(default_factory=dict)  # column -> strptime format
+    numerics: Dict[str, str] = field(default_factory=dict)  # column -> downcast dtype
+    strings: List[str] = field(default_factory=list)
+    lists: Dict[str, str] = field(default_factory=dict)  # column -> separator
+
+    def read_dtypes(self, columns: Optional[List[str]] = None) -> Dict[str, str]:
+        dtypes = {column: 'category' for column in self.categoricals}
+        dtypes.update(self.numerics)
+        dtypes.update({column: 'string' for column in self.strings})
+        return {column: dtype for column, dtype in dtypes.items() if columns is None or column in columns}
+
+    def fingerprint(self) -> str:
+        return hashlib.blake2b(json.dumps([CACHE_VERSION, self.__dict__], sort_keys=True).encode('utf-8'),
+                               digest_size=8).hexdigest()
+
+
+# Money stays float64 (float32 loses paise/cents above ~100k); counts, IDs and sensor readings are downcast
+DATASETS = {
+    'airaware': DatasetSchema(
+        'AirAware/Datasets/airaware_aqi_dataset_5000.csv',
+        categoricals=['City'],
+        timestamps={'Timestamp': '%Y-%m-%d %H:%M:%S'},
+        numerics={'AQI': 'int16', 'PM2.5': 'float32', 'PM10': 'float32', 'CO': 'float32', 'NO2': 'float32',
+                  'SO2': 'float32', 'O3': 'float32', 'Latitude': 'float32', 'Longitude': 'float32'},
+    ),
+    'cafepulse': DatasetSchema(
+        'CaféPulse/Datasets/CafePulse_SalesData.csv',
+        categoricals=['Item'],
+        timestamps={'Timestamp': '%Y-%m-%d %H:%M:%S'},
+        numerics={'TransactionID': 'int32', 'OutletID': 'int16', 'CustomerID': 'int32', 'Price': 'float64',
+                  'Quantity': 'int16', 'Total': 'float64'},
+    ),
+    'cityeats': DatasetSchema(
+        'CityEats/Datasets/CityEats_Delivery_Data.csv',
+        categoricals=['Area', 'Restaurant', 'Weather', 'Time_of_Day'],
+        timestamps={'Order_Time': '%Y-%m-%d %H:%M:%S'},
+        numerics={'Estimated_Delivery_Time_min': 'int16', 'Actual_Delivery_Time_min': 'int16',
+                  'Delay_Minutes': 'int16'},
+        strings=['Order_ID'],
+    ),
+    'greencart': DatasetSchema(
+        'GreenCart/Datasets/greencart_sales_data.csv',
+        categoricals=['Product Name', 'Category'],
+        timestamps={'Date of Sale': '%Y-%m-%d'},
+        numerics={'Price': 'float64', 'Quantity Sold': 'int16', 'Revenue': 'float64'},
+    ),
+    'tournet': DatasetSchema(
+        'TourNet/Datasets/tournet_social_data.csv',
+        categoricals=['location', 'sentiment'],
+        timestamps={'date': '%Y-%m-%d'},
+        numerics={'engagement': 'int32'},
+        strings=['username', 'post'],
+        lists={'hashtags': ','},
+    ),
+    'fintrack_bank': DatasetSchema(
+        'FinTrack360/Datasets/Raw Datasets/bank_statement_5000.csv',
+        categoricals=['Description'],
+        timestamps={'Date': '%Y-%m-%d'},
+        numerics={'Debit (INR)': 'float64', 'Credit (INR)': 'float64', 'Balance': 'float64'},
+    ),
+    'fintrack_income': DatasetSchema(
+        'FinTrack360/Datasets/Raw Datasets/income_expense_summary_5000.csv',
+        timestamps={'Month': '%b %Y'},
+        numerics={'Income (INR)': 'float64', 'Expense (INR)': 'float64', 'Savings (INR)': 'float64'},
+    ),
+    'fintrack_sms': DatasetSchema(
+        'FinTrack360/Datasets/Raw Datasets/sms_data_5000.csv',
+        categoricals=['sender'],
+        timestamps={'timestamp': '%Y-%m-%d %H:%M:%S'},
+        numerics={'id': 'int32'},
+        strings=['message'],
+    ),
+    'fintrack_upi': DatasetSchema(
+        'FinTrack360/Datasets/Raw Datasets/upi_logs_5000.csv',
+        categoricals=['UPI ID', 'Type', 'Purpose'],
+        timestamps={'Date': '%Y-%m-%d'},
+        numerics={'Amount': 'float64'},
+    ),
+}
+
+
+def get_schema(name: str) -> DatasetSchema:
+    try:
+        return DATASETS[name]
+    except KeyError:
+        raise KeyError(f"Unknown dataset '{name}', expected one of {sorted(DATASETS)}") from None
+
+
+def resolve_path(schema: DatasetSchema, path: Optional[str] = None) -> Path:
+    # An explicit path (e.g. a scaled-up copy with the same columns) wins over the bundled file
+    return Path(path) if path else REPO_ROOT / schema.path
+
+
+def _finish(df: pd.DataFrame, schema: DatasetSchema) -> pd.DataFrame:
+    for column, fmt in schema.timestamps.items():
+        if column in df:
+            df[column] = pd.to_datetime(df[column], format=fmt, errors='coerce')
+    for column, separator in schema.lists.items():
+        if column in df:
+            # Tags repeat across rows, so each distinct string is stored once
+            interned = {}
+            df[column] = [[interned.setdefault(tag.strip(), tag.strip()) for tag in value.split(separator)
+                           if tag.strip()] if isinstance(value, str) else [] for value in df[column]]
+    return df
+
+
+def iter_dataset(name: str, path: Optional[str] = None, chunksize: int = 100000,
+                 columns: Optional[List[str]] = None) -> Iterator[pd.DataFrame]:
+    # Typed chunks for files too large to load at once. Categories are per chunk; union_categoricals or
+    # load_dataset give a frame-wide category set.
+    schema = get_schema(name)
+    for chunk in pd.read_csv(resolve_path(schema, path), usecols=columns, dtype=schema.read_dtypes(columns),
+                             chunksize=chunksize):
+        yield _finish(chunk, schema)
+
+
+def read_dataset(name: str, path: Optional[str] = None, columns: Optional[List[str]] = None,
+                 chunksize: int = 1_000_000) -> pd.DataFrame:
+    chunks = list(iter_dataset(name, path, chunksize, columns))
+    if len(chunks) == 1:
+        return chunks[0]
+    schema = get_schema(name)
+    df = pd.concat(chunks, ignore_index=True)
+    for column in schema.categoricals:
+        if column in df:
+            # Chunks may see different category sets; concat falls back to strings, so re-encode once
+            df[column] = df[column].astype('category')
+    return df
+
+
+def read_appended(name: str, path: Optional[str] = None, offset: int = 0) -> Tuple[pd.DataFrame, int]:
+    # Typed rows appended to a CSV since `offset`, the byte position returned by the previous call (0 reads the
+    # whole file). Only complete lines are taken, so a row still being written is picked up next time.
+    schema = get_schema(name)
+    with open(resolve_path(schema, path), 'rb') as f:
+        header = f.readline()
+        offset = max(offset, f.tell())
+        f.seek(offset)
+        data = f.read()
+    end = data.rfind(b'\n') + 1
+    df = pd.read_csv(io.BytesIO(header + data[:end]), dtype=schema.read_dtypes())
+    return _finish(df, schema), offset + end
+
+
+def file_digest(path: Path) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class DatasetCache:
+    # Binary copies of parsed datasets under CACHE_DIR. A cache entry is valid while the source's size and mtime
+    # match; if only the mtime moved (touch, fresh checkout) the content hash decides and the entry is kept.
+    def __init__(self, cache_dir: Path = CACHE_DIR):
+        self.cache_dir = Path(cache_dir)
+
+    def _stem(self, name: str, source: Path) -> Path:
+        key = hashlib.blake2b(str(source.resolve()).encode('utf-8'), digest_size=6).hexdigest()
+        return self.cache_dir / f"{name}-{key}"
+
+    def _source_state(self, source: Path) -> Dict:
+        stat = source.stat()
+        return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+    def _meta_path(self, stem: Path) -> Path:
+        return stem.with_suffix('.meta.json')
+
+    def is_valid(self, name: str, source: Path) -> bool:
+        stem = self._stem(name, source)
+        meta_path = self._meta_path(stem)
+        if not meta_path.exists():
+            return False
+        meta = json.loads(meta_path.read_text())
+        state = self._source_state(source)
+        if meta.get('schema') != get_schema(name).fingerprint() or meta['source']['size'] != state['size']:
+            return False
+        if meta['source']['mtime_ns'] != state['mtime_ns']:
+            if meta.get('digest') != file_digest(source):
+                return False
+            meta['source'] = state
+            meta_path.write_text(json.dumps(meta))
+        return True
+
+    def _write_meta(self, name: str, source: Path, stem: Path, **extra):
+        meta_path = self._meta_path(stem)
+        meta = json.loads(meta_path.read_text()) if meta_path.exists() else {}
+        if meta.get('source') != self._source_state(source) or meta.get('schema') != get_schema(name).fingerprint():
+            meta = {'source': self._source_state(source), 'digest': file_digest(source),
+                    'schema': get_schema(name).fingerprint()}
+        meta.update(extra)
+        meta_path.write_text(json.dumps(meta))
+
+    def frame_path(self, name: str, source: Path) -> Path:
+        return self._stem(name, source).with_suffix('.feather' if feather is not None else '.pkl')
+
+    def read_frame(self, name: str, source: Path, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        path = self.frame_path(name, source)
+        if feather is not None:
+            # Memory-mapped Arrow read; only the requested columns are materialised
+            df = feather.read_table(path, columns=columns, memory_map=True).to_pandas()
+            for column in get_schema(name).lists:
+                if column in df:
+                    # Arrow hands list columns back as NumPy arrays; keep the same type as a fresh parse
+                    df[column] = df[column].map(list)
+            return df
+        df = pd.read_pickle(path)
+        return df[columns] if columns else df
+
+    def write_frame(self, name: str, source: Path, df: pd.DataFrame):
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        stem = self._stem(name, source)
+        self._meta_path(stem).unlink(missing_ok=True)
+        # Arrays derived from the previous version of the source are stale as well
+        array_dir = self.array_dir(name, source)
+        if array_dir.exists():
+            for child in array_dir.iterdir():
+                child.unlink()
+        path = self.frame_path(name, source)
+        if feather is not None:
+            feather.write_feather(df, path, compression='uncompressed')
+        else:
+            df.to_pickle(path)
+        self._write_meta(name, source, stem, frame=path.name)
+
+    def array_dir(self, name: str, source: Path) -> Path:
+        return self._stem(name, source).with_suffix('.npy.d')
+
+    def clear(self, name: Optional[str] = None) -> int:
+        removed = 0
+        if self.cache_dir.exists():
+            for path in self.cache_dir.glob(f"{name}-*" if name else '*'):
+                if path.is_dir():
+                    for child in path.iterdir():
+                        child.unlink()
+                    path.rmdir()
+                else:
+                    path.unlink()
+                removed += 1
+        return removed
+
+
+def load_dataset(name: str, path: Optional[str] = None, columns: Optional[List[str]] = None,
+                 use_cache: bool = True, cache: Optional[DatasetCache] = None) -> pd.DataFrame:
+    schema = get_schema(name)
+    source = resolve_path(schema, path)
+    cache = cache or DatasetCache()
+    if use_cache and cache.is_valid(name, source) and cache.frame_path(name, source).exists():
+        return cache.read_frame(name, source, columns)
+    df = read_dataset(name, path)
+    if use_cache:
+        cache.write_frame(name, source, df)
+        logger.info(f"Cached {name} ({len(df)} rows) at {cache.frame_path(name, source)}")
+    return df[columns] if columns else df
+
+
+def load_arrays(name: str, path: Optional[str] = None, columns: Optional[List[str]] = None,
+                cache: Optional[DatasetCache] = None) -> Dict[str, np.ndarray]:
+    # Read-only memory-mapped columns. Numerics keep their downcast dtype, timestamps are int64 nanoseconds and
+    # categoricals are integer codes (categories in <column>.categories.json).
+    schema = get_schema(name)
+    source = resolve_path(schema, path)
+    cache = cache or DatasetCache()
+    array_dir = cache.array_dir(name, source)
+    wanted = columns or list(schema.numerics) + list(schema.timestamps) + schema.categoricals
+    if not (cache.is_valid(name, source) and array_dir.exists()
+            and all((array_dir / f"{column}.npy").exists() for column in wanted)):
+        df = load_dataset(name, path, cache=cache)
+        array_dir.mkdir(parents=True, exist_ok=True)
+        for column in wanted:
+            series = df[column]
+            if column in schema.timestamps:
+                values = series.to_numpy(dtype='datetime64[ns]').view(np.int64)
+            elif isinstance(series.dtype, pd.CategoricalDtype):
+                values = series.cat.codes.to_numpy()
+                (array_dir / f"{column}.categories.json").write_text(json.dumps(series.cat.categories.tolist()))
+            else:
+                values = series.to_numpy()
+            np.save(array_dir / f"{column}.npy", values)
+    return {column: np.load(array_dir / f"{column}.npy", mmap_mode='r') for column in wanted}
+
+
+def array_categories(name: str, column: str, path: Optional[str] = None,
+                     cache: Optional[DatasetCache] = None) -> List[str]:
+    cache = cache or DatasetCache()
+    array_dir = cache.array_dir(name, resolve_path(get_schema(name), path))
+    return json.loads((array_dir / f"{column}.categories.json").read_text())
+
+
+def memory_mb(df: pd.DataFrame) -> float:
+    return df.memory_usage(deep=True).sum() / 1e6
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="Build the dataset cache and compare against plain read_csv")
+    parser.add_argument('names', nargs='*', default=sorted(DATASETS))
+    parser.add_argument('--path', help="load this file with the schema of the (single) named dataset")
+    parser.add_argument('--clear', action='store_true', help="drop cached copies first")
+    args = parser.parse_args()
+
+    cache = DatasetCache()
+    if args.clear:
+        logger.info(f"Removed {cache.clear()} cache entries")
+
+    print(f"{'dataset':<16} {'rows':>9} {'read_csv_s':>11} {'read_csv_mb':>12} {'typed_s':>8} {'typed_mb':>9} "
+          f"{'cached_s':>9}")
+    for name in args.names:
+        source = resolve_path(get_schema(name), args.path)
+        start = time.perf_counter()
+        plain = pd.read_csv(source)
+        plain_s = time.perf_counter() - start
+        start = time.perf_counter()
+        typed = load_dataset(name, args.path, use_cache=False)
+        typed_s = time.perf_counter() - start
+        load_dataset(name, args.path, cache=cache)
+        start = time.perf_counter()
+        load_dataset(name, args.path, cache=cache)
+        cached_s = time.perf_counter() - start
+        print(f"{name:<16} {len(plain):>9} {plain_s:>11.3f} {memory_mb(plain):>12.2f} {typed_s:>8.3f} "
+              f"{memory_mb(typed):>9.2f} {cached_s:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
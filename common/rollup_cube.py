@@ -0,0 +1,435 @@
+import argparse
+import json
+import logging
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from dataset_loader import get_schema, load_dataset, read_appended, resolve_path
+
+logger = logging.getLogger(__name__)
+
+WEEKDAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+# Buckets with a known label set start with it, so their axes are in natural order
+FIXED_LABELS = {'hour': list(range(24)), 'weekday': WEEKDAYS}
+# Above this share of a cuboid's cells per batch, one bincount over the whole array beats scattered adds
+BINCOUNT_RATIO = 0.125
+
+
+class Dimension:
+    # A cube axis: `column` of the source frame, optionally bucketed ('hour', 'weekday', 'day' or 'month').
+    # Labels get integer codes in first-seen order and the vocabulary only grows, so existing cells keep their
+    # position as new rows arrive. Days and months are coded internally as datetime64[D]/[M] integers.
+    def __init__(self, name: str, column: str, bucket: Optional[str] = None):
+        if bucket not in (None, 'hour', 'weekday', 'day', 'month'):
+            raise ValueError(f"Unknown bucket '{bucket}', expected 'hour', 'weekday', 'day' or 'month'")
+        self.name = name
+        self.column = column
+        self.bucket = bucket
+        self.labels = pd.Index(FIXED_LABELS.get(bucket, []))
+        self._order = self._rank = None
+
+    def values(self, frame: pd.DataFrame):
+        series = frame[self.column]
+        if self.bucket == 'hour':
+            return series.dt.hour.to_numpy()
+        if self.bucket == 'weekday':
+            return pd.Categorical.from_codes(series.dt.dayofweek.fillna(-1).to_numpy(dtype=np.int64), WEEKDAYS)
+        if self.bucket in ('day', 'month'):
+            unit = 'D' if self.bucket == 'day' else 'M'
+            return series.to_numpy(dtype=f'datetime64[{unit}]').astype(np.int64)
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            return series.array
+        return series.to_numpy()
+
+    def encode(self, frame: pd.DataFrame) -> np.ndarray:
+        # Rows whose value is missing (NaN, None, NaT) get code -1 and never become a label
+        present = frame[self.column].notna().to_numpy()
+        if not present.all():
+            codes = np.full(len(frame), -1, dtype=np.intp)
+            if present.any():
+                codes[present] = self.encode(frame[present])
+            return codes
+        values = self.values(frame)
+        if isinstance(values, pd.Categorical):
+            # Encode the (few) categories once and map the row codes through them
+            return self._encode(np.asarray(values.categories))[values.codes]
+        return self._encode(values)
+
+    def _encode(self, values: np.ndarray) -> np.ndarray:
+        codes = self.labels.get_indexer(values)
+        missing = codes < 0
+        if missing.any():
+            self.labels = self.labels.append(pd.Index(pd.unique(values[missing])))
+            codes[missing] = self.labels.get_indexer(values[missing])
+        return codes
+
+    def lookup(self, labels: Sequence) -> np.ndarray:
+        # Codes for user-facing labels (dates as 'YYYY-MM-DD', months as 'YYYY-MM'); unknown labels are dropped
+        if self.bucket in ('day', 'month'):
+            unit = 'D' if self.bucket == 'day' else 'M'
+            labels = np.array(labels, dtype=f'datetime64[{unit}]').astype(np.int64)
+        codes = self.labels.get_indexer(pd.Index(labels))
+        return codes[codes >= 0]
+
+    def order(self) -> np.ndarray:
+        # Codes in label order (weekdays stay Monday..Sunday); cached until the vocabulary grows
+        if self._order is None or len(self._order) != len(self.labels):
+            self._order = (np.arange(len(self.labels)) if self.bucket == 'weekday'
+                           else np.argsort(self.labels.to_numpy(), kind='stable'))
+            self._rank = np.empty_like(self._order)
+            self._rank[self._order] = np.arange(len(self._order))
+        return self._order
+
+    def rank(self) -> np.ndarray:
+        self.order()
+        return self._rank
+
+    def display(self) -> pd.Index:
+        if self.bucket == 'day':
+            return pd.Index(self.labels.to_numpy(dtype=np.int64).astype('datetime64[D]'), name=self.name)
+        if self.bucket == 'month':
+            return pd.Index(np.datetime_as_string(self.labels.to_numpy(dtype=np.int64).astype('datetime64[M]')),
+                            name=self.name)
+        return pd.Index(self.labels, name=self.name)
+
+
+class Cuboid:
+    # Dense sums (one array per measure) plus a row count for one combination of dimensions. Axes are
+    # allocated with spare capacity and doubled when a vocabulary outgrows them.
+    def __init__(self, dims: List[Dimension], measures: Sequence[str]):
+        self.dims = dims
+        self.names = tuple(dim.name for dim in dims)
+        self.shape = tuple(max(8, len(dim.labels)) for dim in dims)
+        self.counts = np.zeros(self.shape, dtype=np.int64)
+        self.sums = {measure: np.zeros(self.shape) for measure in measures}
+
+    @property
+    def cells(self) -> int:
+        return int(np.prod([len(dim.labels) for dim in self.dims]))
+
+    def _fit(self):
+        needed = tuple(len(dim.labels) for dim in self.dims)
+        if all(n <= size for n, size in zip(needed, self.shape)):
+            return
+        shape = tuple(size if n <= size else max(2 * size, n) for n, size in zip(needed, self.shape))
+        used = tuple(slice(0, size) for size in self.shape)
+        for name, array in [('counts', self.counts)] + [(measure, array) for measure, array in self.sums.items()]:
+            grown = np.zeros(shape, dtype=array.dtype)
+            grown[used] = array
+            if name == 'counts':
+                self.counts = grown
+            else:
+                self.sums[name] = grown
+        self.shape = shape
+
+    def add(self, codes: Dict[str, np.ndarray], weights: Dict[str, np.ndarray]):
+        self._fit()
+        flat = np.ravel_multi_index([codes[name] for name in self.names], self.shape)
+        size = self.counts.size
+        if len(flat) > BINCOUNT_RATIO * size:
+            self.counts += np.bincount(flat, minlength=size).reshape(self.shape)
+            for measure, array in self.sums.items():
+                array += np.bincount(flat, weights=weights[measure], minlength=size).reshape(self.shape)
+        else:
+            np.add.at(self.counts.reshape(-1), flat, 1)
+            for measure, array in self.sums.items():
+                np.add.at(array.reshape(-1), flat, weights[measure])
+
+    def used(self, array: np.ndarray) -> np.ndarray:
+        return array[tuple(slice(0, len(dim.labels)) for dim in self.dims)]
+
+
+class RollupCube:
+    # Materialised group-by sums at several granularities. update() folds a batch of new rows into every
+    # cuboid (O(batch) per cuboid), so the cube never needs a full recompute; query() answers a slice from the
+    # smallest cuboid that covers the requested and filtered dimensions.
+    def __init__(self, dataset: str, dimensions: List[Dimension], measures: Dict[str, str],
+                 cuboids: Sequence[Sequence[str]]):
+        self.dataset = dataset
+        self.dimensions = {dim.name: dim for dim in dimensions}
+        self.measures = measures  # measure name -> source column
+        self.cuboids = [Cuboid([self.dimensions[name] for name in names], list(measures)) for names in cuboids]
+        self.rows = 0
+        self.skipped = 0  # rows left out because a dimension value was missing
+        self.offset = 0  # bytes of the source CSV already folded in; only from_source/refresh move it
+
+    def update(self, frame: pd.DataFrame) -> int:
+        if frame.empty:
+            return 0
+        codes = {name: dim.encode(frame) for name, dim in self.dimensions.items()}
+        weights = {measure: frame[column].to_numpy(dtype=np.float64) for measure, column in self.measures.items()}
+        # A row with no label on some axis has no cell to go in, so it is dropped from every cuboid and counted
+        complete = np.logical_and.reduce([code >= 0 for code in codes.values()])
+        if not complete.all():
+            skipped = int((~complete).sum())
+            self.skipped += skipped
+            logger.warning(f"Skipped {skipped} rows with a missing dimension value ({self.skipped} so far)")
+            codes = {name: code[complete] for name, code in codes.items()}
+            weights = {measure: weight[complete] for measure, weight in weights.items()}
+        for cuboid in self.cuboids:
+            cuboid.add(codes, weights)
+        added = int(complete.sum())
+        self.rows += added
+        return added
+
+    @classmethod
+    def from_source(cls, dataset: str, path: Optional[str] = None) -> 'RollupCube':
+        # Builds the cube from the source CSV and records how far it read, so refresh() picks up from there
+        cube = make_cube(dataset)
+        cube.refresh(path)
+        return cube
+
+    def refresh(self, path: Optional[str] = None) -> int:
+        # Folds in only the rows appended to the source CSV since the last refresh
+        if (self.rows or self.skipped) and not self.offset:
+            raise ValueError("Cube rows came from update(), so the source offset is unknown and refresh() would "
+                             "count them again; build the cube with RollupCube.from_source instead")
+        frame, self.offset = read_appended(self.dataset, path, self.offset)
+        return self.update(frame)
+
+    def cuboid_for(self, dims: Sequence[str]) -> Cuboid:
+        covering = [cuboid for cuboid in self.cuboids if set(dims) <= set(cuboid.names)]
+        if not covering:
+            raise ValueError(f"No materialised cuboid covers {sorted(dims)}; cuboids: "
+                             f"{[cuboid.names for cuboid in self.cuboids]}")
+        return min(covering, key=lambda cuboid: cuboid.cells)
+
+    def query(self, measure: str = 'revenue', by: Sequence[str] = (),
+              where: Optional[Dict[str, Sequence]] = None) -> pd.Series:
+        # Sum of `measure` (or 'count' for rows) grouped by `by`, over rows whose `where` dimensions take one of
+        # the given labels. Like a pandas group-by, empty groups are left out and groups come out sorted.
+        where = where or {}
+        cuboid = self.cuboid_for(list(by) + list(where))
+        counts = cuboid.used(cuboid.counts)
+        values = counts if measure == 'count' else cuboid.used(cuboid.sums[measure])
+        selected = {}
+        for axis, name in enumerate(cuboid.names):
+            dim = self.dimensions[name]
+            if name in where:
+                codes = dim.lookup(where[name])
+                selected[name] = codes[np.argsort(dim.rank()[codes], kind='stable')]
+            elif name in by:
+                selected[name] = dim.order()
+            else:
+                continue
+            counts = np.take(counts, selected[name], axis=axis)
+            values = np.take(values, selected[name], axis=axis)
+        other = tuple(axis for axis, name in enumerate(cuboid.names) if name not in by)
+        counts = counts.sum(axis=other)
+        values = values.sum(axis=other)
+        if not by:
+            return pd.Series([values.item()], name=measure)
+        kept = [name for name in cuboid.names if name in by]
+        order = [kept.index(name) for name in by]
+        counts = counts.transpose(order)
+        values = values.transpose(order)
+        present = np.nonzero(counts)
+        levels = [self.dimensions[name].display()[selected[name]] for name in by]
+        if len(by) == 1:
+            index = levels[0][present[0]]
+        else:
+            index = pd.MultiIndex(levels=levels, codes=list(present), names=list(by), verify_integrity=False)
+        return pd.Series(values[present], index=index, name=measure)
+
+    def nbytes(self) -> int:
+        return sum(cuboid.counts.nbytes + sum(array.nbytes for array in cuboid.sums.values())
+                   for cuboid in self.cuboids)
+
+    def save(self, path: str):
+        arrays = {}
+        for i, cuboid in enumerate(self.cuboids):
+            arrays[f'{i}:count'] = cuboid.used(cuboid.counts)
+            for measure, array in cuboid.sums.items():
+                arrays[f'{i}:{measure}'] = cuboid.used(array)
+        meta = {'dataset': self.dataset, 'rows': self.rows, 'skipped': self.skipped, 'offset': self.offset,
+                'labels': {name: dim.labels.tolist() for name, dim in self.dimensions.items()}}
+        np.savez_compressed(path, meta=np.array(json.dumps(meta)), **arrays)
+
+    @classmethod
+    def load(cls, path: str) -> 'RollupCube':
+        with np.load(path) as data:
+            meta = json.loads(data['meta'].item())
+            cube = make_cube(meta['dataset'])
+            cube.rows, cube.offset = meta['rows'], meta['offset']
+            cube.skipped = meta.get('skipped', 0)
+            for name, labels in meta['labels'].items():
+                cube.dimensions[name].labels = pd.Index(labels)
+            for i, cuboid in enumerate(cube.cuboids):
+                cuboid._fit()
+                used = tuple(slice(0, len(dim.labels)) for dim in cuboid.dims)
+                cuboid.counts[used] = data[f'{i}:count']
+                for measure, array in cuboid.sums.items():
+                    array[used] = data[f'{i}:{measure}']
+        return cube
+
+
+def make_cube(dataset: str) -> RollupCube:
+    if dataset == 'cafepulse':
+        return RollupCube(
+            dataset,
+            [Dimension('outlet', 'OutletID'), Dimension('item', 'Item'), Dimension('hour', 'Timestamp', 'hour'),
+             Dimension('weekday', 'Timestamp', 'weekday'), Dimension('day', 'Timestamp', 'day')],
+            {'revenue': 'Total', 'quantity': 'Quantity'},
+            [('outlet', 'item', 'hour'), ('outlet', 'item', 'weekday', 'hour'), ('outlet', 'item', 'day'),
+             ('item', 'hour'), ('outlet', 'day')],
+        )
+    if dataset == 'greencart':
+        return RollupCube(
+            dataset,
+            [Dimension('category', 'Category'), Dimension('product', 'Product Name'),
+             Dimension('day', 'Date of Sale', 'day'), Dimension('month', 'Date of Sale', 'month'),
+             Dimension('weekday', 'Date of Sale', 'weekday')],
+            {'revenue': 'Revenue', 'quantity': 'Quantity Sold'},
+            [('category', 'day'), ('category', 'product', 'day'), ('category', 'product', 'month'),
+             ('category', 'weekday')],
+        )
+    raise KeyError(f"No rollup cube defined for '{dataset}', expected 'cafepulse' or 'greencart'")
+
+
+# (label, measure, by, where) dashboard questions per dataset, used by the benchmark
+QUERIES = {
+    'cafepulse': [
+        ('revenue by outlet x item x hour', 'revenue', ['outlet', 'item', 'hour'], None),
+        ('heatmap: transactions by weekday x hour', 'count', ['weekday', 'hour'], None),
+        ('top items at outlet 3', 'quantity', ['item'], {'outlet': [3]}),
+        ('daily revenue, outlets 1-3', 'revenue', ['outlet', 'day'], {'outlet': [1, 2, 3]}),
+        ('lattes by hour', 'quantity', ['hour'], {'item': ['Latte']}),
+    ],
+    'greencart': [
+        ('revenue by category x day', 'revenue', ['category', 'day'], None),
+        ('revenue by product x month', 'revenue', ['product', 'month'], None),
+        ('units by product, Fruits', 'quantity', ['product'], {'category': ['Fruits']}),
+        ('weekday revenue by category', 'revenue', ['category', 'weekday'], None),
+    ],
+}
+
+
+def grouped(frame: pd.DataFrame, cube: RollupCube, measure: str, by: Sequence[str],
+            where: Optional[Dict[str, Sequence]]) -> pd.Series:
+    # The pandas equivalent of cube.query over a frame that already has one column per dimension
+    if where:
+        mask = np.ones(len(frame), dtype=bool)
+        for name, labels in where.items():
+            mask &= frame[name].isin(labels).to_numpy()
+        frame = frame[mask]
+    column = measure if measure == 'count' else cube.measures[measure]
+    if not by:
+        return pd.Series([len(frame) if measure == 'count' else frame[column].sum()], name=measure)
+    groups = frame.groupby(list(by), observed=True)
+    return groups.size() if measure == 'count' else groups[column].sum()
+
+
+def dimension_frame(frame: pd.DataFrame, cube: RollupCube) -> pd.DataFrame:
+    # Rows missing a dimension value are dropped, as update() does
+    frame = frame.dropna(subset=list({dim.column for dim in cube.dimensions.values()}))
+    out = frame.copy()
+    for name, dim in cube.dimensions.items():
+        values = dim.values(frame)
+        if dim.bucket == 'day':
+            values = values.astype('datetime64[D]')
+        elif dim.bucket == 'month':
+            values = np.datetime_as_string(values.astype('datetime64[M]'))
+        out[name] = values
+    return out
+
+
+def timed(func, repeat: int) -> Tuple[float, object]:
+    best, value = float('inf'), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        value = func()
+        best = min(best, time.perf_counter() - start)
+    return best, value
+
+
+def check_refresh(dataset: str, path: Optional[str] = None, batches: int = 4) -> int:
+    # Builds a cube from the first half of a copy of the CSV, appends the other half in `batches` writes with a
+    # refresh after each, and checks every query against pandas over the whole file. Returns the rows refreshed.
+    source = resolve_path(get_schema(dataset), path)
+    with open(source, 'rb') as f:
+        header, *lines = f.read().splitlines(keepends=True)
+    if lines and not lines[-1].endswith(b'\n'):
+        lines[-1] += b'\n'
+    half = len(lines) // 2
+    with tempfile.TemporaryDirectory() as tmp:
+        copy = Path(tmp) / source.name
+        with open(copy, 'wb') as f:
+            f.write(header + b''.join(lines[:half]))
+        cube = RollupCube.from_source(dataset, str(copy))
+        refreshed = 0
+        step = max(-(-(len(lines) - half) // batches), 1)
+        for begin in range(half, len(lines), step):
+            with open(copy, 'ab') as f:
+                f.write(b''.join(lines[begin:begin + step]))
+            refreshed += cube.refresh(str(copy))
+        if cube.refresh(str(copy)):
+            raise SystemExit("A refresh with nothing appended added rows")
+        prepared = dimension_frame(load_dataset(dataset, str(copy), use_cache=False), cube)
+    if cube.rows != len(prepared):
+        raise SystemExit(f"Refreshed cube has {cube.rows} rows, the file has {len(prepared)}")
+    for label, measure, by, where in QUERIES[dataset]:
+        answer = cube.query(measure, by, where)
+        expected = grouped(prepared, cube, measure, by, where)
+        if not answer.index.equals(expected.index) or not np.allclose(answer.to_numpy(), expected.to_numpy()):
+            raise SystemExit(f"Refreshed cube and pandas disagree on '{label}'")
+    return refreshed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a rollup cube incrementally and compare slice queries "
+                                                 "with pandas group-bys")
+    parser.add_argument('dataset', choices=['cafepulse', 'greencart'])
+    parser.add_argument('--input', help="sales CSV; defaults to the bundled dataset")
+    parser.add_argument('--scale', type=int, help="resample the data to this many rows")
+    parser.add_argument('--batch', type=int, default=1000, help="rows per incremental update")
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--output', help="save the cube (.npz)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    frame = load_dataset(args.dataset, args.input)
+    if args.scale:
+        frame = frame.sample(args.scale, replace=True, random_state=0).reset_index(drop=True)
+
+    start = time.perf_counter()
+    full = make_cube(args.dataset)
+    full.update(frame)
+    rebuild = time.perf_counter() - start
+
+    # Half the rows build the cube, the rest arrive as new sales in batches
+    cube = make_cube(args.dataset)
+    half = len(frame) // 2
+    cube.update(frame.iloc[:half])
+    start = time.perf_counter()
+    for begin in range(half, len(frame), args.batch):
+        cube.update(frame.iloc[begin:begin + args.batch])
+    incremental = time.perf_counter() - start
+    batches = -(-(len(frame) - half) // args.batch)
+    print(f"{len(frame)} rows, {len(cube.cuboids)} cuboids, {cube.nbytes() / 1e6:.2f} MB")
+    print(f"Full build: {rebuild * 1000:.1f} ms; {batches} incremental batches of {args.batch}: "
+          f"{incremental / max(batches, 1) * 1000:.2f} ms per batch ({(len(frame) - half) / incremental:.0f} rows/sec)")
+
+    prepared = dimension_frame(frame, cube)
+    print(f"\n{'query':<42} {'groups':>7} {'cube ms':>9} {'pandas ms':>10} {'speedup':>8}")
+    for label, measure, by, where in QUERIES[args.dataset]:
+        cube_time, answer = timed(lambda: cube.query(measure, by, where), args.repeat)
+        pandas_time, expected = timed(lambda: grouped(prepared, cube, measure, by, where), args.repeat)
+        same = answer.index.equals(expected.index) and np.allclose(answer.to_numpy(), expected.to_numpy())
+        if not same or not np.allclose(full.query(measure, by, where).to_numpy(), answer.to_numpy()):
+            raise SystemExit(f"Cube and pandas disagree on '{label}'")
+        print(f"{label:<42} {len(answer):>7} {cube_time * 1000:>9.3f} {pandas_time * 1000:>10.3f} "
+              f"{pandas_time / cube_time:>7.1f}x")
+    refreshed = check_refresh(args.dataset, args.input)
+    print(f"\nRefresh check: {refreshed} rows appended to a copy of the CSV and refreshed in; all queries match pandas")
+    if args.output:
+        cube.save(args.output)
+        logger.info(f"Cube written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()